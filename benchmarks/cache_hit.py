@@ -0,0 +1,60 @@
+"""Compare serving a cached 1,000 appeals list as decoded data and as pre-rendered bytes.
+
+Run with `make benchmark_cache_hit`.
+"""
+import json
+import time
+import timeit
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from dto.schemas.appeals import AppealListResponse
+from utils.cache import CacheEntry, render_json
+from utils.enums import AppealResponsibilityArea, AppealStatus
+
+ROWS_COUNT = 1000
+NUMBER = 200
+
+rows = [
+    {
+        "id": i,
+        "message": f"You really need to do something with the appeal number {i}",
+        "responsibility_area": list(AppealResponsibilityArea)[i % len(AppealResponsibilityArea)],
+        "status": list(AppealStatus)[i % len(AppealStatus)],
+        "comment": None,
+        "created_at": datetime(2026, 1, 1) + timedelta(minutes=i),
+    }
+    for i in range(ROWS_COUNT)
+]
+type_adapter = TypeAdapter(list[AppealListResponse])
+
+
+def serve_decoded(cached_data: str) -> JSONResponse:
+    # The former hit path: decode the entry, then validate and serialize it as FastAPI does for the route
+    data = json.loads(cached_data)["data"]
+    return JSONResponse(jsonable_encoder(type_adapter.validate_python(data)))
+
+
+def serve_rendered(cached_data: bytes) -> object:
+    _, entry = CacheEntry.load(cached_data)
+    return entry.to_response()
+
+
+def main() -> None:
+    decoded_entry = json.dumps({"tags": {}, "created_at": time.time(), "data": jsonable_encoder(rows)})
+    rendered_entry = CacheEntry(render_json(rows, type_adapter), time.time(), 0).dump({})
+    assert json.loads(serve_decoded(decoded_entry).body) == json.loads(serve_rendered(rendered_entry).body)
+
+    for name, serve, entry in (
+        ("decoded", serve_decoded, decoded_entry),
+        ("rendered", serve_rendered, rendered_entry),
+    ):
+        seconds = min(timeit.repeat(lambda: serve(entry), number=NUMBER, repeat=5)) / NUMBER
+        print(f"{name:>8}: {seconds * 1000:.3f} ms per hit of {ROWS_COUNT} rows")
+
+
+if __name__ == "__main__":
+    main()
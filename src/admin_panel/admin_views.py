@@ -4,4 +4,5 @@ from db.tables import Appeal
 
 
 class AppealAdmin(ModelView, model=Appeal):
-    column_list = [column.name for column in Appeal.__table__.columns]
+    column_list = [column.name for column in Appeal.__table__.columns if column.name != "message_tsv"]
+    form_excluded_columns = [Appeal.message_tsv]
@@ -0,0 +1,52 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from clients.cache.abstract_client import AbstractCacheClient
+from common.settings import settings
+from utils.lru import LRUCache
+
+
+class MemoryClient(AbstractCacheClient):
+    """In-process cache tier, entries are evicted by their tags on invalidation."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self._entries = LRUCache(
+            max_entries, max_bytes, size_of=lambda entry: entry[1], on_evict=self._forget_tags
+        )
+        self._tag_keys: defaultdict[str, set[str]] = defaultdict(set)
+        # Grows on every invalidation, so a computation can tell whether an invalidation happened meanwhile
+        self.invalidations_count = 0
+
+    async def get(self, key: str) -> Any:
+        if (entry := self._entries.get(key)) is not None:
+            return entry[0]
+
+    async def set(self, key: str, value: Any, expire: int, tags: Iterable[str] = (), size: int = 0) -> None:
+        tags = tuple(tags)
+        self._entries.set(key, (value, size, tags), expire)
+        for tag in tags:
+            self._tag_keys[tag].add(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        self.invalidations_count += 1
+        for tag in tags:
+            for key in self._tag_keys.pop(tag, set()):
+                self._entries.delete(key)
+
+    def clear(self) -> None:
+        self.invalidations_count += 1
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        return self._entries.get_stats()
+
+    def _forget_tags(self, key: str, entry: tuple) -> None:
+        for tag in entry[2]:
+            if keys := self._tag_keys.get(tag):
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+
+memory_client = MemoryClient(settings.LOCAL_CACHE_MAX_ENTRIES, settings.LOCAL_CACHE_MAX_BYTES)
@@ -1,9 +1,22 @@
+import time
+from collections.abc import AsyncIterator
+from uuid import uuid4
+
 from redis.asyncio.client import Redis, Retry
 from redis.backoff import ExponentialBackoff
-from redis.exceptions import BusyLoadingError, ConnectionError, TimeoutError
+from redis.exceptions import BusyLoadingError, ConnectionError, RedisError, TimeoutError
 
 from clients.cache.abstract_client import AbstractCacheClient
 from common.settings import settings
+from utils.circuit_breaker import CircuitBreaker
+
+# Deletes the lock only if it is still held by the token owner
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
 
 
 class RedisClient(AbstractCacheClient):
@@ -14,20 +27,90 @@ class RedisClient(AbstractCacheClient):
         self._client = Redis(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
-            socket_timeout=3,
-            retry=Retry(ExponentialBackoff(), 3),
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            retry=Retry(ExponentialBackoff(), settings.REDIS_RETRIES),
             retry_on_error=[BusyLoadingError, ConnectionError, TimeoutError],
-            decode_responses=True,
+            # Cached responses are stored as bytes and served as is
+            decode_responses=False,
             auto_close_connection_pool=True,
         )
+        # Calls fail fast while Redis is unavailable, the callers treat it as a cache miss
+        self.breaker = CircuitBreaker(
+            "redis",
+            settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+            settings.REDIS_BREAKER_RECOVERY_TIMEOUT,
+            errors=(RedisError, OSError),
+        )
 
     async def disconnect(self):
         await self._client.aclose(close_connection_pool=True)
 
-    async def set(self, key: str, value: str, expire: int) -> None:
-        await self._client.set(name=key, value=value, ex=expire)
+    async def set(self, key: str, value: bytes | str, expire: int) -> None:
+        async with self.breaker.guard():
+            await self._client.set(name=key, value=value, ex=expire)
+
+    async def get(self, key: str,) -> bytes | None:
+        async with self.breaker.guard():
+            return await self._client.get(name=key)
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        async with self.breaker.guard():
+            return await self._client.mget(keys)
+
+    async def acquire_lock(self, key: str, expire: float) -> str | None:
+        """Return the lock token if the lock is acquired, the lock is released by itself after `expire` seconds."""
+        token = uuid4().hex
+        async with self.breaker.guard():
+            if await self._client.set(name=key, value=token, px=int(expire * 1000), nx=True):
+                return token
+
+    async def release_lock(self, key: str, token: str) -> None:
+        async with self.breaker.guard():
+            await self._client.eval(RELEASE_LOCK_SCRIPT, 1, key, token)
+
+    async def publish(self, channel: str, message: str) -> None:
+        async with self.breaker.guard():
+            await self._client.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        async with self._client.pubsub() as pubsub:
+            await pubsub.subscribe(channel)
+            while True:
+                # Polling with a timeout not above socket_timeout keeps an idle subscription alive
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=settings.REDIS_SOCKET_TIMEOUT
+                )
+                if message is not None:
+                    yield message["data"]
+
+    async def incr_many(self, keys: list[str], expire: int) -> None:
+        """Increment the counters, a missing one starts from the current time so an expired counter never repeats."""
+        async with self.breaker.guard(), self._client.pipeline(transaction=True) as pipeline:
+            for key in keys:
+                pipeline.set(key, time.time_ns(), nx=True)
+                pipeline.incr(key)
+                pipeline.expire(key, expire)
+            await pipeline.execute()
+
+    async def increment_scores(
+            self, key: str, increments: dict[str, float], decay: float, max_size: int, expire: int
+    ) -> None:
+        """Decay the scores of the sorted set, add the increments and keep the `max_size` top members."""
+        async with self.breaker.guard(), self._client.pipeline(transaction=True) as pipeline:
+            pipeline.zunionstore(key, {key: decay})
+            for member, increment in increments.items():
+                pipeline.zincrby(key, increment, member)
+            pipeline.zremrangebyrank(key, 0, -max_size - 1)
+            pipeline.expire(key, expire)
+            await pipeline.execute()
+
+    async def get_top_members(self, key: str, count: int) -> list[bytes]:
+        async with self.breaker.guard():
+            return await self._client.zrevrange(key, 0, count - 1)
 
-    async def get(self, key: str,) -> str:
-        return await self._client.get(name=key)
+    async def remove_members(self, key: str, members: list[bytes]) -> None:
+        async with self.breaker.guard():
+            await self._client.zrem(key, *members)
 
 redis_client = RedisClient()
@@ -22,18 +22,26 @@ class AuthorizationClient(BaseAsyncClient):
             return response.status, await response.json()
 
     async def get_me(self, cookies: dict) -> tuple:
-        async with self._get(path="/api/v1/users/me", cookies=cookies) as response:
+        async with self._get(
+            path="/api/v1/users/me", cookies=cookies, hedge=settings.AUTHORIZATION_SERVICE_HEDGING
+        ) as response:
             return response.status, await response.json()
 
     async def get_list(self, cookies: dict, role: UserRole | None = None) -> tuple:
         params = {"role": role} if role else None
-        async with self._get(path="/api/v1/users/list", params=params, cookies=cookies) as response:
+        async with self._get(
+            path="/api/v1/users/list", params=params, cookies=cookies, hedge=settings.AUTHORIZATION_SERVICE_HEDGING
+        ) as response:
             return response.status, await response.json()
 
     async def get_user_email(self, user_id: str) -> tuple:
         async with self._get(path=f"/api/v1/users/{user_id}/email") as response:
             return response.status, await response.text()
 
+    async def get_users_emails(self, user_ids: list[str]) -> tuple:
+        async with self._post(path="/api/v1/users/emails", json={"user_ids": user_ids}) as response:
+            return response.status, await response.json()
+
     async def delete(self, cookies: dict, user_id: str) -> tuple:
         async with self._delete(path=f"/api/v1/users/{user_id}", cookies=cookies) as response:
             return response.status, await response.json()
@@ -2,25 +2,116 @@
 
 import asyncio
 import logging
+import random
+import re
+import time
 from abc import ABC
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
-from aiohttp import ClientConnectionError, ClientSession, ServerDisconnectedError
+from aiohttp import (
+    ClientConnectionError,
+    ClientResponse,
+    ClientSession,
+    DummyCookieJar,
+    ServerDisconnectedError,
+    TCPConnector,
+    TraceConfig,
+)
 
 from common.settings import settings
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.histogram import Histogram
+from utils.retry_budget import RetryBudget
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(format=settings.LOGGING_FORMAT)
 logger.setLevel(logging.DEBUG)
 
+# Path segments with identifiers, replaced to keep the number of the per-endpoint metrics bounded
+ID_SEGMENT_PATTERN = re.compile(r"/(\d+|[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12})(?=/|$)")
+
+# The clients of the same service share the breaker
+breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_path_template(path: str) -> str:
+    return ID_SEGMENT_PATTERN.sub("/{id}", "/" + path.lstrip("/"))
+
 
 class BaseAsyncClient(ABC):
+    """HTTP client keeping a pool of keep-alive connections in one session, opened and closed by the lifespan."""
+
     base_url: str
     timeout: int
+    _session: ClientSession | None = None
 
     def __init__(self, base_url: str, timeout: int):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.stats = Counter()
+        self.breaker = breakers.setdefault(
+            self.base_url,
+            CircuitBreaker(
+                self.base_url,
+                settings.HTTP_BREAKER_FAILURE_THRESHOLD,
+                settings.HTTP_BREAKER_RECOVERY_TIMEOUT,
+                errors=(asyncio.TimeoutError, ClientConnectionError),
+            ),
+        )
+        self.retry_budget = RetryBudget(settings.HTTP_RETRY_BUDGET_RATIO, settings.HTTP_RETRY_BUDGET_MAX_TOKENS)
+        self.hedge_budget = RetryBudget(settings.HTTP_HEDGE_BUDGET_RATIO, settings.HTTP_HEDGE_BUDGET_MAX_TOKENS)
+        self.outcomes: defaultdict[str, Counter] = defaultdict(Counter)
+        self.latencies: defaultdict[str, Histogram] = defaultdict(Histogram)
+
+    async def connect(self) -> None:
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+
+    async def disconnect(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_stats(self) -> dict:
+        return {
+            "requests": self.stats["requests"],
+            "connections_created": self.stats["connections_created"],
+            "connections_reused": self.stats["connections_reused"],
+            "circuit_breaker": self.breaker.get_stats(),
+            "retry_budget_exhausted": self.retry_budget.exhausted,
+            "hedges": self.stats["hedges"],
+            "hedge_wins": self.stats["hedge_wins"],
+            "hedge_budget_exhausted": self.hedge_budget.exhausted,
+            "endpoints": {
+                endpoint: {"outcomes": self.outcomes[endpoint], "latency": self.latencies[endpoint].get_stats()}
+                for endpoint in sorted(self.latencies)
+            },
+        }
+
+    def _create_session(self) -> ClientSession:
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(self._count("requests"))
+        trace_config.on_connection_create_end.append(self._count("connections_created"))
+        trace_config.on_connection_reuseconn.append(self._count("connections_reused"))
+
+        return ClientSession(
+            connector=TCPConnector(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            ),
+            # The session is shared by the users, the cookies are passed with every request instead
+            cookie_jar=DummyCookieJar(),
+            trace_configs=[trace_config],
+        )
+
+    def _count(self, stat: str):
+        async def on_event(session, context, params) -> None:
+            self.stats[stat] += 1
+        return on_event
 
     @asynccontextmanager
     async def _request(
@@ -35,6 +126,7 @@ class BaseAsyncClient(ABC):
         timeout: int = None,
         retry: int = 2,
         retry_delay: int = 0.5,
+        hedge: bool = False,
     ):
         logger.debug(f"Start _request({method}, {path})")
         retry = retry if retry is not None else 0
@@ -46,36 +138,106 @@ class BaseAsyncClient(ABC):
 
         logger.info(f"\nSending request: {method} {request_url}")
 
-        while retry >= 0:
-            retry -= 1
-
+        endpoint = f"{method} {get_path_template(path)}"
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            started_at = time.perf_counter()
             try:
-                async with ClientSession() as session:
-                    async with session.request(
-                        method,
-                        request_url.lstrip("/"),
-                        params=params,
-                        data=data,
-                        json=json,
-                        headers=headers,
-                        cookies=cookies,
-                        timeout=timeout or self.timeout,
-                    ) as response:
-                        await self._logging_after_response(response, method, request_url)
-                        yield response
-                        logger.debug(f"Finish _request({method}, {path})")
-                        return
+                # Outside of the lifespan, e.g. in a command, the session is opened on the first request
+                await self.connect()
+                async with self.breaker.guard(), self._send(
+                    endpoint,
+                    # Only the idempotent requests may be sent twice
+                    hedge and method == "GET",
+                    method,
+                    request_url.lstrip("/"),
+                    params=params,
+                    data=data,
+                    json=json,
+                    headers=headers,
+                    cookies=cookies,
+                    timeout=timeout or self.timeout,
+                ) as response:
+                    self._observe(endpoint, started_at, "success" if response.status < 500 else "server_error")
+                    await self._logging_after_response(response, method, request_url)
+                    yield response
+                    logger.debug(f"Finish _request({method}, {path})")
+                    return
 
+            except CircuitOpenError:
+                self._observe(endpoint, started_at, "circuit_open")
+                raise ConnectionError(f"Circuit breaker of {self.base_url} is open. {method} {request_url}")
             except asyncio.TimeoutError:
-                logger.warning(f"Timeout error. Retry in {retry_delay} s...")
+                self._observe(endpoint, started_at, "timeout")
+                error = "Timeout error"
             except ServerDisconnectedError:
-                logger.warning(f"Server disconnected. Retry in {retry_delay} s...")
+                self._observe(endpoint, started_at, "connection_error")
+                error = "Server disconnected"
             except ClientConnectionError:
-                logger.warning(f"Connection error. Retry in {retry_delay} s...")
+                self._observe(endpoint, started_at, "connection_error")
+                error = "Connection error"
+
+            if attempt >= retry or not self.retry_budget.withdraw():
+                logger.warning(f"{error}. No retries left")
+                break
+            # Full jitter keeps the retries of the concurrent requests from arriving at the same moment
+            delay = random.uniform(0, min(retry_delay * 2 ** attempt, settings.HTTP_RETRY_MAX_DELAY))
+            logger.warning(f"{error}. Retry in {delay:.2f} s...")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+        raise ConnectionError(f"Connection error after {attempt} retries. {method} {request_url}")
+
+    @asynccontextmanager
+    async def _send(self, endpoint: str, hedge: bool, method: str, url: str, **kwargs) -> AsyncIterator[ClientResponse]:
+        if not hedge:
+            async with self._session.request(method, url, **kwargs) as response:
+                yield response
+            return
 
-            await asyncio.sleep(retry_delay)
+        # A second request is sent if the first one is slower than most of the endpoint requests,
+        # the first response wins and the other request is cancelled
+        self.hedge_budget.deposit()
+        first_request = asyncio.ensure_future(self._fetch(method, url, **kwargs))
+        requests = {first_request}
+        try:
+            done, _ = await asyncio.wait(requests, timeout=self._get_hedge_delay(endpoint))
+            if not done and self.hedge_budget.withdraw():
+                self.stats["hedges"] += 1
+                requests.add(asyncio.ensure_future(self._fetch(method, url, **kwargs)))
 
-        raise ConnectionError(f"Connection error after {retry} retries. {method} {request_url}")
+            while True:
+                done, pending = await asyncio.wait(requests, return_when=asyncio.FIRST_COMPLETED)
+                if succeeded := [request for request in done if request.exception() is None]:
+                    response_request = succeeded[0]
+                    break
+                if not pending:
+                    response_request = done.pop()
+                    break
+                requests = pending
+        finally:
+            for request in requests:
+                request.cancel()
+
+        if response_request is not first_request:
+            self.stats["hedge_wins"] += 1
+        yield response_request.result()
+
+    async def _fetch(self, method: str, url: str, **kwargs) -> ClientResponse:
+        async with self._session.request(method, url, **kwargs) as response:
+            await response.read()
+            return response
+
+    def _get_hedge_delay(self, endpoint: str) -> float:
+        latencies = self.latencies[endpoint]
+        if latencies.count < settings.HTTP_HEDGE_MIN_SAMPLES:
+            return settings.HTTP_HEDGE_DEFAULT_DELAY
+        return latencies.get_percentile(settings.HTTP_HEDGE_PERCENTILE)
+
+    def _observe(self, endpoint: str, started_at: float, outcome: str) -> None:
+        self.outcomes[endpoint][outcome] += 1
+        self.latencies[endpoint].observe(time.perf_counter() - started_at)
 
     @staticmethod
     async def _logging_after_response(response, method, request_url):
@@ -85,7 +247,9 @@ class BaseAsyncClient(ABC):
             await response.read()
             logger.warning(f"Request failed: {method} {request_url}. Status code: {response.status}")
 
-    def _get(self, path, params=None, headers=None, cookies=None, timeout=None, retry=None, retry_delay=None):
+    def _get(
+            self, path, params=None, headers=None, cookies=None, timeout=None, retry=None, retry_delay=None, hedge=False
+    ):
         return self._request(
             "GET",
             path,
@@ -95,6 +259,7 @@ class BaseAsyncClient(ABC):
             timeout=timeout,
             retry=retry,
             retry_delay=retry_delay,
+            hedge=hedge,
         )
 
     def _post(
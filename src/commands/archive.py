@@ -0,0 +1,22 @@
+"""Appeals archiving: moves the appeals closed long ago to the archive table in batches."""
+
+import asyncio
+import logging
+
+from common.settings import settings
+from db.connector import DatabaseConnector
+from services.appeal import AppealService
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format=settings.LOGGING_FORMAT)
+logger.setLevel(logging.INFO)
+
+
+async def main() -> None:
+    archived_count = await AppealService.archive_closed_appeals()
+    logger.info(f"Appeals archived: {archived_count}")
+    await DatabaseConnector.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
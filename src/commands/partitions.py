@@ -0,0 +1,15 @@
+"""Appeals partitions maintenance: pre-creates future monthly partitions and detaches the expired ones."""
+
+import asyncio
+
+from db.connector import DatabaseConnector
+from db.partitions import maintain_partitions
+
+
+async def main() -> None:
+    await maintain_partitions()
+    await DatabaseConnector.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,15 @@
+"""Appeals statistics reconciliation: rebuilds the rollup tables from the appeals."""
+
+import asyncio
+
+from db.connector import DatabaseConnector
+from services.statistics import StatisticsService
+
+
+async def main() -> None:
+    await StatisticsService.rebuild()
+    await DatabaseConnector.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,3 +1,4 @@
+import asyncio
 import logging.config
 from contextlib import asynccontextmanager
 
@@ -8,12 +9,16 @@ from sqladmin import Admin
 from admin_panel.admin_views import AppealAdmin
 from clients.broker.rabbitmq import rmq_client
 from clients.cache.redis_client import redis_client
+from clients.http.authorization import authorization_client
 from common import logger, settings
 from common.errors import ApplicationError
 from common.exception_handlers import error_handler, request_validation_error_handler
 from db.connector import DatabaseConnector
 from middleware.cors import get_cors_middleware
 from routers.base import router
+from services.appeal import notification_tasks
+from utils.cache import background_tasks, listen_invalidations, retry_invalidations
+from utils.cache_warmer import cache_warmer
 
 
 def setup_exception_handlers(app: FastAPI) -> None:
@@ -33,9 +38,27 @@ def admin_panel_setup(app: FastAPI) -> None:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await DatabaseConnector.connect()
     await rmq_client.connect()
+    await authorization_client.connect()
+    invalidations_retrier = asyncio.create_task(retry_invalidations())
+    if settings.settings.LOCAL_CACHE_ENABLED:
+        invalidations_listener = asyncio.create_task(listen_invalidations())
+    if settings.settings.CACHE_WARM_ENABLED:
+        cache_warming = [asyncio.create_task(cache_warmer.run()), asyncio.create_task(cache_warmer.warm())]
     yield
+    invalidations_retrier.cancel()
+    if settings.settings.LOCAL_CACHE_ENABLED:
+        invalidations_listener.cancel()
+    if settings.settings.CACHE_WARM_ENABLED:
+        for task in cache_warming:
+            task.cancel()
+    # The notifications and the cache refreshes in flight are finished before their clients are disconnected
+    if pending_tasks := notification_tasks | background_tasks:
+        await asyncio.wait(pending_tasks, timeout=settings.settings.BACKGROUND_TASKS_SHUTDOWN_TIMEOUT)
+    await authorization_client.disconnect()
     await rmq_client.disconnect()
+    await DatabaseConnector.disconnect()
     await redis_client.disconnect()
 
 
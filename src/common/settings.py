@@ -4,6 +4,8 @@ from uuid import uuid4
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from utils.enums import ReplicaSelectionStrategy
+
 ROOT_DIR = Path(__file__).parent.parent.parent
 
 
@@ -17,6 +19,24 @@ class Settings(BaseSettings):
     DB_NAME: str = "POSTGRES"
     DB_SCHEMA: str = "appeals_service"
 
+    DB_POOL_SIZE: int = 10
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_TIMEOUT: int = 10
+
+    DB_REPLICA_URLS: str = ""
+    DB_REPLICA_SELECTION: ReplicaSelectionStrategy = ReplicaSelectionStrategy.round_robin
+    DB_REPLICA_MAX_LAG: float = 5.0
+    DB_REPLICA_CHECK_INTERVAL: int = 5
+    DB_READ_YOUR_WRITES_WINDOW: int = 5
+
+    APPEALS_PARTITIONS_AHEAD: int = 3
+    APPEALS_PARTITIONS_RETENTION_MONTHS: int = 0
+    APPEALS_ARCHIVE_AFTER_DAYS: int = 90
+    APPEALS_ARCHIVE_BATCH_SIZE: int = 1000
+    APPEALS_CLAIM_MAX_COUNT: int = 100
+
     TEST_DB_SCHEMA_PREFIX: str = "test_"
     IS_TESTING: bool = False
 
@@ -28,13 +48,48 @@ class Settings(BaseSettings):
 
     SECRET_KEY: str = ""
     ALGORITHM: str = ""
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_TOKEN_CACHE_EXPIRATION: int = 300
+    USER_AGENT_CACHE_MAX_ENTRIES: int = 1000
 
     MAX_PHOTO_SIZE_IN_BYTES: int = 5 * 1024 * 1024
 
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    REDIS_SOCKET_TIMEOUT: float = 0.25
+    REDIS_RETRIES: int = 1
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 5
+    REDIS_BREAKER_RECOVERY_TIMEOUT: float = 5
 
     DEFAULT_CACHE_EXPIRATION: int = 10
+    APPEALS_CACHE_EXPIRATION: int = 300
+    APPEALS_CACHE_STALE: int = 60
+    APPEALS_NEGATIVE_CACHE_EXPIRATION: int = 30
+    CACHE_EARLY_REFRESH_BETA: float = 1.0
+    CACHE_TAG_EXPIRATION: int = 86400
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    CACHE_INVALIDATION_RETRY_INTERVAL: float = 1
+    CACHE_LOCK_EXPIRATION: float = 10
+    CACHE_LOCK_WAIT: float = 2
+    CACHE_LOCK_POLL_INTERVAL: float = 0.05
+    CACHE_COMPRESSION_THRESHOLD: int = 4 * 1024
+    CACHE_COMPRESSION_CODEC: str = "zlib"
+    CACHE_COMPRESSION_LEVEL: int = 1
+    CACHE_MAX_ENTRY_SIZE: int = 8 * 1024 * 1024
+    LOCAL_CACHE_ENABLED: bool = False
+    LOCAL_CACHE_EXPIRATION: int = 30
+    LOCAL_CACHE_MAX_ENTRIES: int = 1000
+    LOCAL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_WARM_ENABLED: bool = False
+    CACHE_WARM_KEYS: int = 20
+    CACHE_WARM_TRACKED_KEYS: int = 100
+    CACHE_WARM_CONCURRENCY: int = 4
+    CACHE_WARM_DELAY: float = 1
+    CACHE_WARM_FLUSH_INTERVAL: float = 60
+    CACHE_WARM_DECAY: float = 0.9
+    CACHE_WARM_STATS_EXPIRATION: int = 86400
+
+    EXPORT_CHUNK_SIZE: int = 1000
 
     S3_URL: str = ""
     S3_BUCKET_NAME: str = ""
@@ -58,6 +113,27 @@ class Settings(BaseSettings):
 
     AUTHORIZATION_SERVICE_URL: str = "http://localhost:8001"
     AUTHORIZATION_SERVICE_TIMEOUT: int = 5
+    AUTHORIZATION_SERVICE_BATCH_EMAILS: bool = False
+    AUTHORIZATION_SERVICE_HEDGING: bool = False
+    USER_EMAIL_CACHE_MAX_ENTRIES: int = 10000
+    USER_EMAIL_CACHE_EXPIRATION: int = 600
+    USER_EMAIL_BATCH_SIZE: int = 50
+    USER_EMAIL_BATCH_DELAY: float = 0.01
+    BACKGROUND_TASKS_SHUTDOWN_TIMEOUT: float = 10
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 20
+    HTTP_KEEPALIVE_TIMEOUT: float = 30
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_RETRY_MAX_DELAY: float = 5
+    HTTP_RETRY_BUDGET_RATIO: float = 0.2
+    HTTP_RETRY_BUDGET_MAX_TOKENS: float = 10
+    HTTP_BREAKER_FAILURE_THRESHOLD: int = 5
+    HTTP_BREAKER_RECOVERY_TIMEOUT: float = 10
+    HTTP_HEDGE_PERCENTILE: float = 0.95
+    HTTP_HEDGE_MIN_SAMPLES: int = 100
+    HTTP_HEDGE_DEFAULT_DELAY: float = 0.5
+    HTTP_HEDGE_BUDGET_RATIO: float = 0.05
+    HTTP_HEDGE_BUDGET_MAX_TOKENS: float = 5
 
     ECHO: bool = False
 
@@ -76,6 +152,9 @@ class Settings(BaseSettings):
         return (f"{'postgresql+asyncpg' if async_mode else 'postgresql'}://"
                 f"{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}")
 
+    def get_db_replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
 
     def get_rmq_url(self) -> str:
         return (f"amqp://{self.RABBITMQ_DEFAULT_USER}:{self.RABBITMQ_DEFAULT_PASS}@"
@@ -1,14 +1,17 @@
 import contextlib
 import logging
+import time
 
 from sqlalchemy import Engine, create_engine
-from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.asyncio import AsyncSession as AsyncSessionType
 from sqlalchemy.orm import Session as SessionType
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
 
 from common.settings import settings
+from db.replicas import Replica, ReplicaSet
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(format=settings.LOGGING_FORMAT)
@@ -16,15 +19,108 @@ logger.setLevel(logging.INFO)
 
 
 class DatabaseConnector:
+
+    _async_engine: AsyncEngine | None = None
+    _replica_set: ReplicaSet | None = None
+    _recent_writers: dict[str, float] = {}
+
     @staticmethod
-    async def get_async_engine() -> AsyncEngine:
+    def build_async_engine(url: str) -> AsyncEngine:
+        if settings.IS_TESTING:
+            # The test client and the tests run in different event loops, pooled asyncpg connections can't be shared
+            return create_async_engine(url=url, echo=settings.ECHO, poolclass=NullPool)
+
         return create_async_engine(
-            url=settings.get_db_url(),
-            # pool_size=settings.POOL_SIZE, Не может использоваться совместно с NullPool
+            url=url,
             echo=settings.ECHO,
-            poolclass=NullPool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
         )
 
+    @classmethod
+    async def connect(cls) -> None:
+        if cls._async_engine is None:
+            cls._async_engine = cls.build_async_engine(settings.get_db_url())
+            logger.info(f"Database connection pool created. {cls._async_engine.pool.status()}")
+
+        if cls._replica_set is None and (replica_urls := settings.get_db_replica_urls()):
+            replicas = []
+            for url in replica_urls:
+                engine = cls.build_async_engine(url)
+                replicas.append(Replica(name=f"{engine.url.host}:{engine.url.port}", engine=engine))
+            cls._replica_set = ReplicaSet(replicas, settings.DB_REPLICA_SELECTION)
+            await cls._replica_set.check_lag()
+            cls._replica_set.start_monitoring(settings.DB_REPLICA_CHECK_INTERVAL)
+            logger.info(f"Read replicas connected: {', '.join(replica.name for replica in replicas)}")
+
+    @classmethod
+    async def disconnect(cls) -> None:
+        if cls._replica_set is not None:
+            await cls._replica_set.dispose()
+            cls._replica_set = None
+
+        if cls._async_engine is not None:
+            await cls._async_engine.dispose()
+            cls._async_engine = None
+            logger.info("Database connection pool disposed")
+
+    @classmethod
+    async def get_async_engine(cls) -> AsyncEngine:
+        # Lazy initialization for the code running outside the application lifespan (tests, scripts)
+        if cls._async_engine is None:
+            await cls.connect()
+        return cls._async_engine
+
+    @staticmethod
+    def get_pool_stats(engine: AsyncEngine | None) -> dict:
+        if engine is None:
+            return {"status": "disconnected"}
+
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return {"status": pool.status()}
+
+        return {
+            "status": pool.status(),
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        }
+
+    @classmethod
+    def get_primary_pool_stats(cls) -> dict:
+        return cls.get_pool_stats(cls._async_engine)
+
+    @classmethod
+    def get_replicas_stats(cls) -> list[dict]:
+        return cls._replica_set.get_stats(cls.get_pool_stats) if cls._replica_set else []
+
+    @classmethod
+    def register_write(cls, *user_ids: str | None) -> None:
+        """Route the next reads of these users to the primary until the replicas catch up with their writes."""
+        now = time.monotonic()
+        if len(cls._recent_writers) > 10_000:
+            cls._recent_writers = {
+                user_id: deadline for user_id, deadline in cls._recent_writers.items() if deadline > now
+            }
+
+        deadline = now + settings.DB_READ_YOUR_WRITES_WINDOW
+        for user_id in user_ids:
+            if user_id:
+                cls._recent_writers[str(user_id)] = deadline
+
+    @classmethod
+    def _choose_replica(cls, user_id: str | None) -> Replica | None:
+        if cls._replica_set is None:
+            return None
+        if user_id and cls._recent_writers.get(str(user_id), 0) > time.monotonic():
+            return None
+        return cls._replica_set.choose()
+
     @staticmethod
     def get_engine(database_schema: str | None = None) -> Engine:
         db_schema = database_schema or settings.DB_SCHEMA
@@ -36,7 +132,7 @@ class DatabaseConnector:
 
     @staticmethod
     def get_sessionmaker(
-        session_engine: AsyncEngine | Engine, is_async: bool = True
+        session_engine: AsyncEngine | AsyncConnection | Engine, is_async: bool = True
     ) -> sessionmaker | async_sessionmaker:
         sessionmaker_func, session_class = (
             (async_sessionmaker, AsyncSessionType) if is_async else (sessionmaker, SessionType)
@@ -62,21 +158,40 @@ class DatabaseConnector:
 
     @classmethod
     @contextlib.asynccontextmanager
-    async def get_async_session(cls, schema: str | None = None) -> AsyncSessionType:
-        """Асинхронный контекстный менеджер подключения к базе данных."""
+    async def get_async_session(
+        cls, schema: str | None = None, read_only: bool = False, user_id: str | None = None
+    ) -> AsyncSessionType:
+        """Асинхронный контекстный менеджер подключения к базе данных.
+
+        Read-only sessions are served by a read replica when one is usable, otherwise by the primary.
+        """
         database_schema = schema or settings.DB_SCHEMA
-        session_maker = cls.get_sessionmaker(session_engine=await cls.get_async_engine())
+        bind = await cls.get_async_engine()
 
-        async with session_maker() as async_session:
+        replica_connection = None
+        if read_only and (replica := cls._choose_replica(user_id)):
             try:
-                conn = await async_session.connection()
-                await conn.execution_options(schema_translate_map={None: database_schema})
-                yield async_session
-            except BaseException:
-                await async_session.rollback()
-                raise
-            finally:
-                await async_session.close()
+                replica_connection = await replica.engine.connect()
+                bind = replica_connection
+            except (DBAPIError, OSError) as e:
+                replica.mark_unavailable(e)
+
+        session_maker = cls.get_sessionmaker(session_engine=bind)
+
+        try:
+            async with session_maker() as async_session:
+                try:
+                    conn = await async_session.connection()
+                    await conn.execution_options(schema_translate_map={None: database_schema})
+                    yield async_session
+                except BaseException:
+                    await async_session.rollback()
+                    raise
+                finally:
+                    await async_session.close()
+        finally:
+            if replica_connection is not None:
+                await replica_connection.close()
 
 
 Session = DatabaseConnector.get_sync_session
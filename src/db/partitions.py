@@ -0,0 +1,153 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession as AsyncSessionType
+
+from common.settings import settings
+from db.connector import AsyncSession
+from db.tables import Appeal
+from utils.enums import AppealStatus
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format=settings.LOGGING_FORMAT)
+logger.setLevel(logging.INFO)
+
+PARTITION_NAME_FORMAT = "appeals_p%Y_%m"
+DEFAULT_PARTITION_NAME = "appeals_default"
+MAINTENANCE_LOCK_NAME = "appeals_partitions_maintenance"
+OPEN_STATUSES = (AppealStatus.accepted, AppealStatus.in_progress)
+
+
+def add_months(month_start: datetime, months: int) -> datetime:
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return month_start.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+
+
+def get_partition_name(month_start: datetime) -> str:
+    return month_start.strftime(PARTITION_NAME_FORMAT)
+
+
+async def get_partition_names(session: AsyncSessionType) -> list[str]:
+    result = await session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_namespace ON pg_namespace.oid = parent.relnamespace "
+            "WHERE parent.relname = :table_name AND pg_namespace.nspname = :schema "
+            "ORDER BY child.relname"
+        ),
+        {"table_name": Appeal.__tablename__, "schema": settings.DB_SCHEMA},
+    )
+    return list(result.scalars().all())
+
+
+async def get_current_month_start(session: AsyncSessionType) -> datetime:
+    result = await session.execute(text("SELECT date_trunc('month', now())::timestamp"))
+    return result.scalar()
+
+
+async def create_partition(session: AsyncSessionType, month_start: datetime) -> None:
+    """Create the partition of the month, the rows of the month are moved to it from the default partition.
+
+    PostgreSQL refuses to create a partition while the default partition holds rows of its range.
+    """
+    partition_name = get_partition_name(month_start)
+    month_range = {"month_start": month_start, "month_end": add_months(month_start, 1)}
+
+    await session.execute(text(
+        f"CREATE TEMPORARY TABLE {partition_name}_moved "
+        f"(LIKE {settings.DB_SCHEMA}.{Appeal.__tablename__}) ON COMMIT DROP"
+    ))
+    await session.execute(
+        text(
+            f"WITH moved AS ("
+            f"DELETE FROM {settings.DB_SCHEMA}.{DEFAULT_PARTITION_NAME} "
+            f"WHERE created_at >= :month_start AND created_at < :month_end RETURNING *"
+            f") INSERT INTO {partition_name}_moved SELECT * FROM moved"
+        ),
+        month_range,
+    )
+    await session.execute(text(
+        f"CREATE TABLE {settings.DB_SCHEMA}.{partition_name} "
+        f"PARTITION OF {settings.DB_SCHEMA}.{Appeal.__tablename__} "
+        f"FOR VALUES FROM ('{month_range['month_start'].isoformat()}') TO ('{month_range['month_end'].isoformat()}')"
+    ))
+    # The generated columns are computed again on the insert
+    columns = ", ".join(column.name for column in Appeal.__table__.columns if column.computed is None)
+    await session.execute(text(
+        f"INSERT INTO {settings.DB_SCHEMA}.{Appeal.__tablename__} ({columns}) "
+        f"SELECT {columns} FROM {partition_name}_moved"
+    ))
+    await session.execute(text(f"DROP TABLE {partition_name}_moved"))
+
+
+async def create_future_partitions(session: AsyncSessionType, months_ahead: int) -> list[str]:
+    """Create monthly partitions from the current month up to `months_ahead` months ahead."""
+    current_month_start = await get_current_month_start(session)
+    existing_partitions = set(await get_partition_names(session))
+
+    created_partitions = []
+    for month in range(months_ahead + 1):
+        month_start = add_months(current_month_start, month)
+        if (partition_name := get_partition_name(month_start)) in existing_partitions:
+            continue
+
+        await create_partition(session, month_start)
+        created_partitions.append(partition_name)
+
+    return created_partitions
+
+
+async def detach_old_partitions(session: AsyncSessionType, retention_months: int) -> list[str]:
+    """Detach monthly partitions older than `retention_months` months which have no open appeals.
+
+    Detached partitions are kept as standalone tables.
+    """
+    retention_start = add_months(await get_current_month_start(session), -retention_months)
+    open_statuses = ", ".join(f"'{appeal_status}'" for appeal_status in OPEN_STATUSES)
+
+    detached_partitions = []
+    for partition_name in await get_partition_names(session):
+        try:
+            month_start = datetime.strptime(partition_name, PARTITION_NAME_FORMAT)
+        except ValueError:
+            continue  # The default partition
+
+        if add_months(month_start, 1) > retention_start:
+            continue
+
+        has_open_appeals = await session.execute(text(
+            f"SELECT EXISTS (SELECT 1 FROM {settings.DB_SCHEMA}.{partition_name} WHERE status IN ({open_statuses}))"
+        ))
+        if has_open_appeals.scalar():
+            logger.warning(f"Partition {partition_name} has open appeals and can't be detached")
+            continue
+
+        await session.execute(text(
+            f"ALTER TABLE {settings.DB_SCHEMA}.{Appeal.__tablename__} "
+            f"DETACH PARTITION {settings.DB_SCHEMA}.{partition_name}"
+        ))
+        detached_partitions.append(partition_name)
+
+    return detached_partitions
+
+
+async def maintain_partitions(
+        months_ahead: int = settings.APPEALS_PARTITIONS_AHEAD,
+        retention_months: int = settings.APPEALS_PARTITIONS_RETENTION_MONTHS,
+) -> None:
+    async with AsyncSession() as session:
+        # Concurrent runs are serialized, the next run sees the partitions created by the previous one
+        await session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:lock_name))"), {"lock_name": MAINTENANCE_LOCK_NAME}
+        )
+        created_partitions = await create_future_partitions(session, months_ahead)
+        detached_partitions = await detach_old_partitions(session, retention_months) if retention_months else []
+        await session.commit()
+
+    if created_partitions:
+        logger.info(f"Appeals partitions created: {', '.join(created_partitions)}")
+    if detached_partitions:
+        logger.info(f"Appeals partitions detached: {', '.join(detached_partitions)}")
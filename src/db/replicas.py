@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from itertools import count
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from common.settings import settings
+from utils.enums import ReplicaSelectionStrategy
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format=settings.LOGGING_FORMAT)
+logger.setLevel(logging.INFO)
+
+REPLICATION_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class Replica:
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.lag: float | None = None
+        self.available: bool = True
+
+    @property
+    def is_usable(self) -> bool:
+        return self.available and (self.lag is None or self.lag <= settings.DB_REPLICA_MAX_LAG)
+
+    @property
+    def checked_out(self) -> int:
+        checkedout = getattr(self.engine.pool, "checkedout", None)
+        return checkedout() if checkedout else 0
+
+    def mark_unavailable(self, error: BaseException) -> None:
+        if self.available:
+            logger.warning(f"Replica {self.name} is unavailable, reads fall back to the primary. {error}")
+        self.available = False
+
+    async def check_lag(self) -> None:
+        try:
+            async with self.engine.connect() as connection:
+                self.lag = float((await connection.execute(REPLICATION_LAG_QUERY)).scalar())
+        except Exception as e:
+            self.mark_unavailable(e)
+            return
+
+        if not self.available:
+            logger.info(f"Replica {self.name} is available again")
+        self.available = True
+
+        if self.lag > settings.DB_REPLICA_MAX_LAG:
+            logger.warning(f"Replica {self.name} lags behind the primary by {self.lag:.1f} s")
+
+
+class ReplicaSet:
+
+    def __init__(self, replicas: list[Replica], strategy: ReplicaSelectionStrategy):
+        self.replicas = replicas
+        self.strategy = strategy
+        self._counter = count()
+        self._monitor_task: asyncio.Task | None = None
+
+    def choose(self) -> Replica | None:
+        if not (usable := [replica for replica in self.replicas if replica.is_usable]):
+            return None
+
+        if self.strategy == ReplicaSelectionStrategy.least_busy:
+            return min(usable, key=lambda replica: replica.checked_out)
+        return usable[next(self._counter) % len(usable)]
+
+    async def check_lag(self) -> None:
+        await asyncio.gather(*(replica.check_lag() for replica in self.replicas))
+
+    async def _monitor(self, interval: int) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(interval)
+
+    def start_monitoring(self, interval: int) -> None:
+        if self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor(interval))
+
+    async def dispose(self) -> None:
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+        await asyncio.gather(*(replica.engine.dispose() for replica in self.replicas))
+
+    def get_stats(self, pool_stats_getter) -> list[dict]:
+        return [
+            {
+                "name": replica.name,
+                "available": replica.available,
+                "lag": replica.lag,
+                "pool": pool_stats_getter(replica.engine),
+            }
+            for replica in self.replicas
+        ]
@@ -1,9 +1,14 @@
-from db.tables.appeals import Appeal
+from db.tables.appeals import Appeal, AppealArchive
 from db.tables.base import BaseModel, CreatedAtMixin, UpdatedAtMixin
+from db.tables.statistics import AppealDailyStatistics, ExecutorBacklogStatistics, ResolutionTimeStatistics
 
 __all__ = [
     "BaseModel",
     "CreatedAtMixin",
     "UpdatedAtMixin",
     "Appeal",
+    "AppealArchive",
+    "AppealDailyStatistics",
+    "ExecutorBacklogStatistics",
+    "ResolutionTimeStatistics",
 ]
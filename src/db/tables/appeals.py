@@ -1,16 +1,78 @@
-from sqlalchemy import ARRAY, UUID, Column, Enum, String, Text
+import datetime
+
+from sqlalchemy import ARRAY, UUID, BigInteger, Column, Computed, DateTime, Enum, Index, String, Text, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from db.tables.base import BaseModel, CreatedAtMixin, IdMixin, UpdatedAtMixin
 from utils.enums import AppealResponsibilityArea, AppealStatus
 
 
-class Appeal(BaseModel, IdMixin, CreatedAtMixin, UpdatedAtMixin):
-    __tablename__ = "appeals"
-
+class AppealMixin:
     user_id = Column(UUID, nullable=False, comment="User")
     message = Column(Text, nullable=False, comment="Appeal text")
+    message_tsv = Column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', message)", persisted=True),
+        comment="Appeal text search vector",
+    )
     photo = Column(ARRAY(String), nullable=True, comment="Appeal photo")
     responsibility_area = Column(Enum(AppealResponsibilityArea), nullable=False, comment="Appeal responsibility area")
-    executor_id =Column(UUID, nullable=True, comment="Executor")
+    executor_id = Column(UUID, nullable=True, comment="Executor")
     status = Column(Enum(AppealStatus), nullable=False, comment="Appeal status")
     comment = Column(Text, nullable=True, comment="Comment from executor")
+    resolved_at = Column(DateTime, nullable=True, comment="Done datetime")
+
+
+class Appeal(BaseModel, IdMixin, CreatedAtMixin, UpdatedAtMixin, AppealMixin):
+    __tablename__ = "appeals"
+    __table_args__ = (
+        Index("IX_appeals_user_id_id", "user_id", "id"),
+        Index(
+            "IX_appeals_executor_id_status_id",
+            "executor_id",
+            "status",
+            "id",
+            postgresql_where=text("executor_id IS NOT NULL"),
+        ),
+        Index("IX_appeals_status_responsibility_area_id", "status", "responsibility_area", "id"),
+        Index("IX_appeals_created_at_id", "created_at", "id"),
+        Index("IX_appeals_accepted_id", "id", postgresql_where=text("status = 'accepted'")),
+        Index("IX_appeals_message_tsv", "message_tsv", postgresql_using="gin"),
+        Index(
+            "IX_appeals_message_trgm",
+            "message",
+            postgresql_using="gin",
+            postgresql_ops={"message": "gin_trgm_ops"},
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    # The partition key must be a part of the primary key of a partitioned table
+    created_at = Column(
+        DateTime,
+        primary_key=True,
+        nullable=False,
+        comment="Creation datetime",
+        default=datetime.datetime.now,
+        server_default=func.now(),
+    )
+
+
+class AppealArchive(BaseModel, CreatedAtMixin, UpdatedAtMixin, AppealMixin):
+    """Closed appeals moved out of the appeals table, see AppealRepository.archive_closed."""
+
+    __tablename__ = "appeals_archive"
+    __table_args__ = (
+        Index("IX_appeals_archive_user_id_id", "user_id", "id"),
+        Index(
+            "IX_appeals_archive_executor_id_id",
+            "executor_id",
+            "id",
+            postgresql_where=text("executor_id IS NOT NULL"),
+        ),
+        Index("IX_appeals_archive_created_at_id", "created_at", "id"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=False, nullable=False, comment="Identifier")
+    archived_at = Column(DateTime, nullable=False, server_default=func.now(), comment="Archiving datetime")
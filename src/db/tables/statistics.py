@@ -0,0 +1,27 @@
+from sqlalchemy import UUID, BigInteger, Column, Date, Enum, Integer
+
+from db.tables.base import BaseModel
+from utils.enums import AppealResponsibilityArea, AppealStatus
+
+
+class AppealDailyStatistics(BaseModel):
+    __tablename__ = "appeal_daily_statistics"
+
+    day = Column(Date, primary_key=True, comment="Appeals creation day")
+    status = Column(Enum(AppealStatus), primary_key=True, comment="Appeal status")
+    responsibility_area = Column(Enum(AppealResponsibilityArea), primary_key=True, comment="Appeal responsibility area")
+    count = Column(BigInteger, nullable=False, default=0, comment="Appeals count")
+
+
+class ExecutorBacklogStatistics(BaseModel):
+    __tablename__ = "executor_backlog_statistics"
+
+    executor_id = Column(UUID, primary_key=True, comment="Executor")
+    count = Column(BigInteger, nullable=False, default=0, comment="Appeals in progress count")
+
+
+class ResolutionTimeStatistics(BaseModel):
+    __tablename__ = "resolution_time_statistics"
+
+    hours = Column(Integer, primary_key=True, comment="Time from creation to done, full hours")
+    count = Column(BigInteger, nullable=False, default=0, comment="Done appeals count")
@@ -1,10 +1,11 @@
 from datetime import datetime
 
-from fastapi import File, UploadFile
-from pydantic import BaseModel, Field, field_validator
+from fastapi import File, HTTPException, UploadFile, status
+from pydantic import BaseModel, Field, computed_field, field_validator, model_validator
 
 from common.settings import settings
-from utils.enums import AppealResponsibilityArea, AppealStatus
+from utils.enums import AppealResponsibilityArea, AppealSortField, AppealStatus
+from utils.pagination import decode_cursor, encode_cursor
 
 
 class PhotoMixin:
@@ -47,6 +48,40 @@ class AppealListFilters(BaseFilters):
     created_date_from: datetime | None = Field(default=None, examples=["2025-01-01"])
     created_date_to: datetime | None = Field(default=None, examples=["2025-12-31"])
     self: bool | None = Field(default=True, description="Select only your own appeals")
+    include_archived: bool = Field(default=False, description="Select the archived closed appeals as well")
+    sort_by: AppealSortField = Field(default=AppealSortField.id, examples=[AppealSortField.id])
+    cursor: str | None = Field(
+        default=None, description="Select the appeals following the one with this next_cursor value"
+    )
+    q: str | None = Field(
+        default=None,
+        min_length=3,
+        max_length=100,
+        description="Search in the appeal text, the results are ordered by relevance",
+        examples=["pothole"],
+    )
+
+    @field_validator("cursor")
+    @classmethod
+    def check_cursor(cls, cursor: str | None):
+        if cursor is not None:
+            try:
+                decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return cursor
+
+    @model_validator(mode="after")
+    def check_pagination_mode(self):
+        if self.cursor is not None and self.offset:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor and offset can't be used together"
+            )
+        if self.cursor is not None and self.q is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Search results are paginated by offset only"
+            )
+        return self
 
 
 class BaseAppealResponse(BaseAppeal):
@@ -57,7 +92,11 @@ class BaseAppealResponse(BaseAppeal):
 
 
 class AppealListResponse(BaseAppealResponse):
-    ...
+
+    @computed_field(description="Cursor for selecting the appeals following this one")
+    @property
+    def next_cursor(self) -> str:
+        return encode_cursor(self.id, self.created_at)
 
 
 class AppealResponse(BaseAppealResponse):
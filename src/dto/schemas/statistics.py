@@ -0,0 +1,32 @@
+"""Statistics schemas."""
+
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+from utils.enums import AppealResponsibilityArea, AppealStatus
+
+
+class AppealStatisticsFilters(BaseModel):
+    date_from: date | None = Field(default=None, examples=["2025-01-01"])
+    date_to: date | None = Field(default=None, examples=["2025-12-31"])
+
+
+class DailyAppealStatistics(BaseModel):
+    day: date
+    status: AppealStatus
+    responsibility_area: AppealResponsibilityArea
+    count: int
+
+
+class ExecutorBacklog(BaseModel):
+    executor_id: str
+    count: int
+
+
+class AppealStatisticsResponse(BaseModel):
+    by_status: dict[AppealStatus, int]
+    by_responsibility_area: dict[AppealResponsibilityArea, int]
+    by_day: list[DailyAppealStatistics]
+    executors_backlog: list[ExecutorBacklog] = Field(description="Appeals in progress per executor")
+    median_resolution_hours: int | None = Field(description="Median time from creation to done, full hours")
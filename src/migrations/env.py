@@ -66,9 +66,12 @@ def run_migrations_online() -> None:
             version_table_schema=target_metadata.schema,
             include_name=include_name,
             include_object=include_object,
+            transaction_per_migration=True,
         )
         connection.execute(sa.text(f"CREATE SCHEMA IF NOT EXISTS {settings.DB_SCHEMA};"))
         connection.execute(sa.text('set search_path to "{}", public'.format(settings.DB_SCHEMA)))
+        # Migrations with CONCURRENTLY operations need their own transactions to switch to the autocommit mode
+        connection.commit()
 
         with context.begin_transaction():
             context.run_migrations()
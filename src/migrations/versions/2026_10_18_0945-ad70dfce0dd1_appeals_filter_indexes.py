@@ -0,0 +1,45 @@
+"""appeals filter indexes
+
+Revision ID: ad70dfce0dd1
+Revises: 70e96d9181ed
+Create Date: 2026-10-18 09:45:12.418305
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from common.settings import settings
+
+# revision identifiers, used by Alembic.
+revision = 'ad70dfce0dd1'
+down_revision = '70e96d9181ed'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("IX_appeals_user_id_id", ["user_id", "id"], None),
+    ("IX_appeals_executor_id_status_id", ["executor_id", "status", "id"], "executor_id IS NOT NULL"),
+    ("IX_appeals_status_responsibility_area_id", ["status", "responsibility_area", "id"], None),
+    ("IX_appeals_created_at_id", ["created_at", "id"], None),
+    ("IX_appeals_accepted_id", ["id"], "status = 'accepted'"),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name,
+                'appeals',
+                columns,
+                schema=settings.DB_SCHEMA,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='appeals', schema=settings.DB_SCHEMA, postgresql_concurrently=True)
@@ -0,0 +1,97 @@
+"""appeals partitioning by created_at
+
+Revision ID: 62ec9d3fb0d1
+Revises: ad70dfce0dd1
+Create Date: 2026-10-18 10:10:41.902114
+
+The appeals table is rebuilt as a table partitioned by month of created_at.
+The rows are copied while the table is locked, so the migration needs a maintenance window.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from common.settings import settings
+
+# revision identifiers, used by Alembic.
+revision = '62ec9d3fb0d1'
+down_revision = 'ad70dfce0dd1'
+branch_labels = None
+depends_on = None
+
+
+SCHEMA = settings.DB_SCHEMA
+PARTITIONS_AHEAD = 3
+INDEXES = [
+    ("IX_appeals_user_id_id", ["user_id", "id"], None),
+    ("IX_appeals_executor_id_status_id", ["executor_id", "status", "id"], "executor_id IS NOT NULL"),
+    ("IX_appeals_status_responsibility_area_id", ["status", "responsibility_area", "id"], None),
+    ("IX_appeals_created_at_id", ["created_at", "id"], None),
+    ("IX_appeals_accepted_id", ["id"], "status = 'accepted'"),
+]
+
+
+def _drop_indexes():
+    for name, _, _ in INDEXES:
+        op.drop_index(name, table_name='appeals_legacy', schema=SCHEMA)
+
+
+def _create_indexes():
+    for name, columns, where in INDEXES:
+        op.create_index(
+            name, 'appeals', columns, schema=SCHEMA, postgresql_where=sa.text(where) if where else None
+        )
+
+
+def _replace_table(partitioned: bool):
+    op.execute(f'ALTER TABLE {SCHEMA}.appeals RENAME TO appeals_legacy')
+    op.execute(f'ALTER TABLE {SCHEMA}.appeals_legacy RENAME CONSTRAINT "PK_appeals" TO "PK_appeals_legacy"')
+    _drop_indexes()
+
+    primary_key = "id, created_at" if partitioned else "id"
+    partition_by = "PARTITION BY RANGE (created_at)" if partitioned else ""
+    op.execute(
+        f'CREATE TABLE {SCHEMA}.appeals ('
+        f'LIKE {SCHEMA}.appeals_legacy INCLUDING DEFAULTS INCLUDING COMMENTS, '
+        f'CONSTRAINT "PK_appeals" PRIMARY KEY ({primary_key})'
+        f') {partition_by}'
+    )
+
+
+def _drop_legacy_table():
+    op.execute(f'ALTER SEQUENCE {SCHEMA}.appeals_id_seq OWNED BY {SCHEMA}.appeals.id')
+    op.execute(f'INSERT INTO {SCHEMA}.appeals SELECT * FROM {SCHEMA}.appeals_legacy')
+    op.execute(f'DROP TABLE {SCHEMA}.appeals_legacy')
+
+
+def upgrade():
+    _replace_table(partitioned=True)
+
+    op.execute(f"CREATE TABLE {SCHEMA}.appeals_default PARTITION OF {SCHEMA}.appeals DEFAULT")
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start timestamp := date_trunc(
+                'month', LEAST(COALESCE((SELECT min(created_at) FROM {SCHEMA}.appeals_legacy), now()), now())
+            );
+        BEGIN
+            WHILE month_start <= date_trunc('month', now()) + interval '{PARTITIONS_AHEAD} months' LOOP
+                EXECUTE format(
+                    'CREATE TABLE {SCHEMA}.%I PARTITION OF {SCHEMA}.appeals FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month_start, '"appeals_p"YYYY_MM'),
+                    month_start,
+                    month_start + interval '1 month'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END
+        $$;
+    """)
+
+    _drop_legacy_table()
+    _create_indexes()
+
+
+def downgrade():
+    _replace_table(partitioned=False)
+    _drop_legacy_table()
+    _create_indexes()
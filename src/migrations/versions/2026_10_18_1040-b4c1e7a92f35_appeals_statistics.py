@@ -0,0 +1,81 @@
+"""appeals statistics
+
+Revision ID: b4c1e7a92f35
+Revises: 62ec9d3fb0d1
+Create Date: 2026-10-18 10:40:27.553918
+
+Rollup tables maintained by the appeal service on every write, backfilled from the existing appeals.
+The done datetime of the existing appeals is taken from their last update.
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from common.settings import settings
+
+# revision identifiers, used by Alembic.
+revision = 'b4c1e7a92f35'
+down_revision = '62ec9d3fb0d1'
+branch_labels = None
+depends_on = None
+
+
+SCHEMA = settings.DB_SCHEMA
+APPEAL_STATUS = postgresql.ENUM(name='appealstatus', create_type=False)
+APPEAL_RESPONSIBILITY_AREA = postgresql.ENUM(name='appealresponsibilityarea', create_type=False)
+
+
+def upgrade():
+    op.add_column(
+        'appeals', sa.Column('resolved_at', sa.DateTime(), nullable=True, comment='Done datetime'), schema=SCHEMA
+    )
+    op.execute(f"UPDATE {SCHEMA}.appeals SET resolved_at = updated_at WHERE status = 'done'")
+
+    op.create_table('appeal_daily_statistics',
+    sa.Column('day', sa.Date(), nullable=False, comment='Appeals creation day'),
+    sa.Column('status', APPEAL_STATUS, nullable=False, comment='Appeal status'),
+    sa.Column('responsibility_area', APPEAL_RESPONSIBILITY_AREA, nullable=False, comment='Appeal responsibility area'),
+    sa.Column('count', sa.BigInteger(), nullable=False, comment='Appeals count'),
+    sa.PrimaryKeyConstraint('day', 'status', 'responsibility_area', name=op.f('PK_appeal_daily_statistics')),
+    schema=SCHEMA
+    )
+    op.create_table('executor_backlog_statistics',
+    sa.Column('executor_id', sa.UUID(), nullable=False, comment='Executor'),
+    sa.Column('count', sa.BigInteger(), nullable=False, comment='Appeals in progress count'),
+    sa.PrimaryKeyConstraint('executor_id', name=op.f('PK_executor_backlog_statistics')),
+    schema=SCHEMA
+    )
+    op.create_table('resolution_time_statistics',
+    sa.Column('hours', sa.Integer(), nullable=False, comment='Time from creation to done, full hours'),
+    sa.Column('count', sa.BigInteger(), nullable=False, comment='Done appeals count'),
+    sa.PrimaryKeyConstraint('hours', name=op.f('PK_resolution_time_statistics')),
+    schema=SCHEMA
+    )
+
+    op.execute(f"""
+        INSERT INTO {SCHEMA}.appeal_daily_statistics (day, status, responsibility_area, count)
+        SELECT created_at::date, status, responsibility_area, count(*)
+        FROM {SCHEMA}.appeals
+        GROUP BY created_at::date, status, responsibility_area
+    """)
+    op.execute(f"""
+        INSERT INTO {SCHEMA}.executor_backlog_statistics (executor_id, count)
+        SELECT executor_id, count(*)
+        FROM {SCHEMA}.appeals
+        WHERE status = 'in_progress' AND executor_id IS NOT NULL
+        GROUP BY executor_id
+    """)
+    op.execute(f"""
+        INSERT INTO {SCHEMA}.resolution_time_statistics (hours, count)
+        SELECT floor(extract(epoch FROM resolved_at - created_at) / 3600)::integer AS hours, count(*)
+        FROM {SCHEMA}.appeals
+        WHERE status = 'done'
+        GROUP BY hours
+    """)
+
+
+def downgrade():
+    op.drop_table('resolution_time_statistics', schema=SCHEMA)
+    op.drop_table('executor_backlog_statistics', schema=SCHEMA)
+    op.drop_table('appeal_daily_statistics', schema=SCHEMA)
+    op.drop_column('appeals', 'resolved_at', schema=SCHEMA)
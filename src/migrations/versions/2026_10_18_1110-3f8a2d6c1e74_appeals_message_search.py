@@ -0,0 +1,53 @@
+"""appeals message search
+
+Revision ID: 3f8a2d6c1e74
+Revises: b4c1e7a92f35
+Create Date: 2026-10-18 11:10:03.271846
+
+Adding the stored generated column rewrites every appeals partition, so the migration needs a maintenance window.
+The pg_trgm extension is left in place on downgrade, other database objects may use it.
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from common.settings import settings
+
+# revision identifiers, used by Alembic.
+revision = '3f8a2d6c1e74'
+down_revision = 'b4c1e7a92f35'
+branch_labels = None
+depends_on = None
+
+
+SCHEMA = settings.DB_SCHEMA
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public')
+    op.add_column(
+        'appeals',
+        sa.Column(
+            'message_tsv',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', message)", persisted=True),
+            nullable=True,
+            comment='Appeal text search vector',
+        ),
+        schema=SCHEMA,
+    )
+    op.create_index('IX_appeals_message_tsv', 'appeals', ['message_tsv'], schema=SCHEMA, postgresql_using='gin')
+    op.create_index(
+        'IX_appeals_message_trgm',
+        'appeals',
+        ['message'],
+        schema=SCHEMA,
+        postgresql_using='gin',
+        postgresql_ops={'message': 'gin_trgm_ops'},
+    )
+
+
+def downgrade():
+    op.drop_index('IX_appeals_message_trgm', table_name='appeals', schema=SCHEMA)
+    op.drop_index('IX_appeals_message_tsv', table_name='appeals', schema=SCHEMA)
+    op.drop_column('appeals', 'message_tsv', schema=SCHEMA)
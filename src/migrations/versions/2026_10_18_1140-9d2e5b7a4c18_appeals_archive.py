@@ -0,0 +1,68 @@
+"""appeals archive
+
+Revision ID: 9d2e5b7a4c18
+Revises: 3f8a2d6c1e74
+Create Date: 2026-10-18 11:40:52.608137
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from common.settings import settings
+
+# revision identifiers, used by Alembic.
+revision = '9d2e5b7a4c18'
+down_revision = '3f8a2d6c1e74'
+branch_labels = None
+depends_on = None
+
+
+SCHEMA = settings.DB_SCHEMA
+APPEAL_STATUS = postgresql.ENUM(name='appealstatus', create_type=False)
+APPEAL_RESPONSIBILITY_AREA = postgresql.ENUM(name='appealresponsibilityarea', create_type=False)
+
+
+def upgrade():
+    op.create_table('appeals_archive',
+    sa.Column('id', sa.BigInteger(), autoincrement=False, nullable=False, comment='Identifier'),
+    sa.Column(
+        'archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False, comment='Archiving datetime'
+    ),
+    sa.Column(
+        'created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False, comment='Creation datetime'
+    ),
+    sa.Column(
+        'updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False, comment='Update datetime'
+    ),
+    sa.Column('user_id', sa.UUID(), nullable=False, comment='User'),
+    sa.Column('message', sa.Text(), nullable=False, comment='Appeal text'),
+    sa.Column(
+        'message_tsv',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple', message)", persisted=True),
+        nullable=True,
+        comment='Appeal text search vector',
+    ),
+    sa.Column('photo', sa.ARRAY(sa.String()), nullable=True, comment='Appeal photo'),
+    sa.Column('responsibility_area', APPEAL_RESPONSIBILITY_AREA, nullable=False, comment='Appeal responsibility area'),
+    sa.Column('executor_id', sa.UUID(), nullable=True, comment='Executor'),
+    sa.Column('status', APPEAL_STATUS, nullable=False, comment='Appeal status'),
+    sa.Column('comment', sa.Text(), nullable=True, comment='Comment from executor'),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True, comment='Done datetime'),
+    sa.PrimaryKeyConstraint('id', name=op.f('PK_appeals_archive')),
+    schema=SCHEMA
+    )
+    op.create_index('IX_appeals_archive_user_id_id', 'appeals_archive', ['user_id', 'id'], schema=SCHEMA)
+    op.create_index(
+        'IX_appeals_archive_executor_id_id',
+        'appeals_archive',
+        ['executor_id', 'id'],
+        schema=SCHEMA,
+        postgresql_where=sa.text('executor_id IS NOT NULL'),
+    )
+    op.create_index('IX_appeals_archive_created_at_id', 'appeals_archive', ['created_at', 'id'], schema=SCHEMA)
+
+
+def downgrade():
+    op.drop_table('appeals_archive', schema=SCHEMA)
@@ -1,46 +1,134 @@
+from collections.abc import AsyncIterator, Sequence
 from datetime import timedelta
 
-from sqlalchemy import Select, delete, insert, select, update
+from sqlalchemy import (
+    Select,
+    Subquery,
+    Update,
+    delete,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
 from sqlalchemy.engine.row import Row
 
 from db.connector import AsyncSession
-from db.tables import Appeal
+from db.tables import Appeal, AppealArchive
+from utils.enums import AppealResponsibilityArea, AppealSortField, AppealStatus
+from utils.pagination import decode_cursor
+
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+CLOSED_STATUSES = (AppealStatus.done, AppealStatus.cancelled, AppealStatus.rejected)
+LIST_COLUMNS = ("id", "message", "responsibility_area", "status", "comment", "created_at")
 
 
 class AppealRepository:
 
     @staticmethod
-    async def insert(session: AsyncSession, appeal_data: dict) -> int:
-        query = insert(Appeal).values(**appeal_data).returning(Appeal.id)
+    async def insert(session: AsyncSession, appeal_data: dict) -> Row:
+        query = insert(Appeal).values(**appeal_data).returning(
+            Appeal.id,
+            Appeal.user_id,
+            Appeal.created_at,
+            Appeal.status,
+            Appeal.responsibility_area,
+            Appeal.executor_id,
+            Appeal.resolved_at,
+        )
         result = await session.execute(query)
-        return result.scalar()
+        return result.one()
 
     @classmethod
     async def select_appeals_list(cls, session: AsyncSession, filters: dict) -> list[Row]:
-        query = select(
-            Appeal.id, Appeal.message, Appeal.responsibility_area, Appeal.status, Appeal.comment, Appeal.created_at
-        )
-        query = cls._get_filtered_query(query, filters)
-        result = await session.execute(query)
+        result = await session.execute(cls.get_appeals_list_query(filters))
         return result.all()
 
+    @classmethod
+    async def stream_appeals_list(
+            cls, session: AsyncSession, filters: dict, chunk_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        query = cls.get_appeals_list_query(filters).execution_options(yield_per=chunk_size)
+        result = await session.stream(query)
+        async for rows in result.partitions(chunk_size):
+            yield rows
+
+    @classmethod
+    def get_appeals_list_query(cls, filters: dict) -> Select:
+        if not filters.get("include_archived"):
+            query = select(*(getattr(Appeal, name) for name in LIST_COLUMNS))
+            return cls._get_paginated_query(cls._get_filtered_query(query, filters), filters, Appeal)
+
+        # Every part is limited to the rows the page may take from it, the union is paginated once more
+        part_filters = {**filters, "offset": None}
+        if limit := filters.get("limit"):
+            part_filters["limit"] = limit + (filters.get("offset") or 0)
+
+        parts = []
+        for model in (Appeal, AppealArchive):
+            query = select(*(getattr(model, name) for name in LIST_COLUMNS), model.message_tsv)
+            query = cls._get_filtered_query(query, filters, model)
+            parts.append(cls._get_paginated_query(query, part_filters, model))
+
+        appeals = union_all(*parts).subquery("appeals_with_archive")
+        query = select(*(appeals.c[name] for name in LIST_COLUMNS))
+        return cls._get_paginated_query(query, filters, appeals.c)
+
     @staticmethod
-    async def select_appeal(session: AsyncSession, appeal_id: int, user_id: str | None = None) -> Row:
-        query = select(
-            Appeal.id,
-            Appeal.message,
-            Appeal.photo,
-            Appeal.responsibility_area,
-            Appeal.status,
-            Appeal.comment,
-            Appeal.created_at,
-        ).where(Appeal.id == appeal_id)
+    async def select_appeal(
+            session: AsyncSession, appeal_id: int, user_id: str | None = None, include_archived: bool = False
+    ) -> Row:
+        """Select the appeal, with `include_archived` the archive is searched in the same statement.
+
+        The parts of the union are read in order and the limit stops it, so the archive is probed only on a miss.
+        """
+        queries = []
+        for model in (Appeal, AppealArchive) if include_archived else (Appeal,):
+            query = select(
+                model.id,
+                model.message,
+                model.photo,
+                model.responsibility_area,
+                model.status,
+                model.comment,
+                model.created_at,
+            ).where(model.id == appeal_id)
 
-        if user_id:
-            query = query.where(Appeal.user_id == user_id)
+            if user_id:
+                query = query.where(model.user_id == user_id)
+            queries.append(query)
 
+        query = union_all(*queries).limit(1) if include_archived else queries[0]
         result = await session.execute(query)
-        return result.one_or_none()
+        return result.first()
+
+    @staticmethod
+    async def archive_closed(session: AsyncSession, closed_days_ago: int, batch_size: int) -> list[Row]:
+        """Move a batch of the appeals closed more than `closed_days_ago` days ago to the archive table.
+
+        The appeals locked by other transactions are skipped, they are archived by the next run.
+        """
+        batch = select(Appeal.id, Appeal.created_at).where(
+            Appeal.status.in_(CLOSED_STATUSES), Appeal.updated_at < func.now() - timedelta(days=closed_days_ago)
+        ).limit(batch_size).with_for_update(skip_locked=True).cte("batch")
+
+        columns = [
+            column.name for column in AppealArchive.__table__.columns
+            if column.name != "archived_at" and column.computed is None
+        ]
+        moved = delete(Appeal).where(
+            Appeal.id == batch.c.id, Appeal.created_at == batch.c.created_at
+        ).returning(*(getattr(Appeal, name) for name in columns)).cte("moved")
+
+        query = insert(AppealArchive).from_select(columns, select(*(moved.c[name] for name in columns))).returning(
+            AppealArchive.id, AppealArchive.user_id, AppealArchive.executor_id
+        )
+        result = await session.execute(query)
+        return result.all()
 
     @staticmethod
     async def select_appeals_photo(session: AsyncSession, filters: dict) -> list:
@@ -48,9 +136,72 @@ class AppealRepository:
         result = await session.execute(query)
         return result.scalars().all()
 
+    @classmethod
+    async def update(cls, session: AsyncSession, filters: dict, values: dict) -> Row:
+        """Update the appeal and return its new values along with the previous ones prefixed with `previous_`."""
+        previous = cls._select_state().filter_by(**filters).with_for_update().subquery("previous")
+        result = await session.execute(cls._get_update_query(previous, values))
+        return result.one_or_none()
+
+    @classmethod
+    async def claim(
+            cls,
+            session: AsyncSession,
+            executor_id: str,
+            count: int,
+            responsibility_area: AppealResponsibilityArea | None = None,
+    ) -> list[Row]:
+        """Assign up to `count` oldest accepted appeals to the executor, rows as returned by `update`.
+
+        The appeals locked by other transactions are skipped, so concurrent claims never wait for each other.
+        """
+        query = cls._select_state().where(Appeal.status == AppealStatus.accepted)
+        if responsibility_area:
+            query = query.where(Appeal.responsibility_area == responsibility_area)
+        previous = query.order_by(Appeal.id).limit(count).with_for_update(skip_locked=True).subquery("previous")
+
+        values = {"executor_id": executor_id, "status": AppealStatus.in_progress}
+        result = await session.execute(cls._get_update_query(previous, values))
+        return sorted(result.all(), key=lambda row: row.id)
+
     @staticmethod
-    async def update(session: AsyncSession, filters: dict, values: dict) -> Row:
-        query = update(Appeal).values(**values).filter_by(**filters).returning(
+    async def delete(session: AsyncSession, filters: dict) -> list[Row]:
+        query = delete(Appeal).filter_by(**filters).returning(
+            Appeal.id,
+            Appeal.user_id,
+            Appeal.photo,
+            Appeal.created_at,
+            Appeal.status,
+            Appeal.responsibility_area,
+            Appeal.executor_id,
+            Appeal.resolved_at,
+        )
+        result = await session.execute(query)
+        return result.all()
+
+    @staticmethod
+    def _select_state() -> Select:
+        return select(
+            Appeal.id,
+            Appeal.created_at,
+            Appeal.status,
+            Appeal.responsibility_area,
+            Appeal.executor_id,
+            Appeal.resolved_at,
+        )
+
+    @staticmethod
+    def _get_update_query(previous: Subquery, values: dict) -> Update:
+        if "status" in values:
+            # A done appeal keeps its resolution datetime when it is saved as done again
+            resolved_at = None
+            if values["status"] == AppealStatus.done:
+                resolved_at = func.coalesce(Appeal.resolved_at, func.now())
+            values = {**values, "resolved_at": resolved_at}
+
+        return update(Appeal).values(**values).where(
+            Appeal.id == previous.c.id, Appeal.created_at == previous.c.created_at
+        ).returning(
             Appeal.id,
             Appeal.user_id,
             Appeal.message,
@@ -59,35 +210,58 @@ class AppealRepository:
             Appeal.status,
             Appeal.comment,
             Appeal.created_at,
+            Appeal.executor_id,
+            Appeal.resolved_at,
+            previous.c.created_at.label("previous_created_at"),
+            previous.c.status.label("previous_status"),
+            previous.c.responsibility_area.label("previous_responsibility_area"),
+            previous.c.executor_id.label("previous_executor_id"),
+            previous.c.resolved_at.label("previous_resolved_at"),
         )
-        result = await session.execute(query)
-        return result.one_or_none()
 
     @staticmethod
-    async def delete(session: AsyncSession, filters: dict) -> list:
-        query = delete(Appeal).filter_by(**filters).returning(Appeal.photo)
-        result = await session.execute(query)
-        return result.scalars().all()
-
-    @staticmethod
-    def _get_filtered_query(query: Select, filters: dict) -> Select:
+    def _get_filtered_query(query: Select, filters: dict, model: type[Appeal | AppealArchive] = Appeal) -> Select:
 
         if user_id := filters.get("user_id"):
-            query = query.where(Appeal.user_id == user_id)
+            query = query.where(model.user_id == user_id)
         elif executor_id := filters.get("executor_id"):
-            query = query.where(Appeal.executor_id == executor_id)
+            query = query.where(model.executor_id == executor_id)
 
         if status := filters.get("status"):
-            query = query.where(Appeal.status == status)
+            query = query.where(model.status == status)
         if responsibility_area := filters.get("responsibility_area"):
-            query = query.where(Appeal.responsibility_area == responsibility_area)
+            query = query.where(model.responsibility_area == responsibility_area)
         if created_date_from := filters.get("created_date_from"):
-            query = query.where(Appeal.created_at >= created_date_from)
+            query = query.where(model.created_at >= created_date_from)
         if created_date_to := filters.get("created_date_to"):
-            query = query.where(Appeal.created_at <= created_date_to + timedelta(1))
+            query = query.where(model.created_at <= created_date_to + timedelta(1))
+        if search_query := filters.get("q"):
+            escaped_search_query = search_query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            # The trigram index serves partial words which are missed by the full-text match
+            query = query.where(or_(
+                model.message_tsv.op("@@")(func.websearch_to_tsquery(SEARCH_CONFIG, search_query)),
+                model.message.ilike(f"%{escaped_search_query}%", escape="\\"),
+            ))
+        if cursor := filters.get("cursor"):
+            cursor_id, cursor_created_at = decode_cursor(cursor)
+            if filters.get("sort_by") == AppealSortField.created_at:
+                query = query.where(tuple_(model.created_at, model.id) > tuple_(cursor_created_at, cursor_id))
+            else:
+                query = query.where(model.id > cursor_id)
+
+        return query
+
+    @staticmethod
+    def _get_paginated_query(query: Select, filters: dict, columns) -> Select:
+        """Order and limit the query, `columns` are the model or the subquery columns the query selects from."""
         if limit := filters.get("limit"):
             query = query.limit(limit)
         if offset := filters.get("offset"):
             query = query.offset(offset)
 
-        return query.order_by(Appeal.id)
\ No newline at end of file
+        if search_query := filters.get("q"):
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, search_query)
+            return query.order_by(func.ts_rank_cd(columns.message_tsv, ts_query).desc(), columns.id)
+        if filters.get("sort_by") == AppealSortField.created_at:
+            return query.order_by(columns.created_at, columns.id)
+        return query.order_by(columns.id)
@@ -0,0 +1,148 @@
+from collections import Counter
+from datetime import date, datetime
+from typing import NamedTuple
+
+from sqlalchemy import Date, Integer, cast, delete, extract, func, insert, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine.row import Row
+
+from db.connector import AsyncSession
+from db.tables import Appeal, AppealArchive, AppealDailyStatistics, ExecutorBacklogStatistics, ResolutionTimeStatistics
+from utils.enums import AppealResponsibilityArea, AppealStatus
+
+
+class AppealState(NamedTuple):
+    created_at: datetime
+    status: AppealStatus
+    responsibility_area: AppealResponsibilityArea
+    executor_id: str | None
+    resolved_at: datetime | None
+
+    @classmethod
+    def from_row(cls, row: Row, prefix: str = "") -> "AppealState":
+        return cls(*(getattr(row, prefix + field) for field in cls._fields))
+
+    @property
+    def resolution_hours(self) -> int:
+        return int((self.resolved_at - self.created_at).total_seconds() // 3600)
+
+
+class StatisticsRepository:
+
+    @classmethod
+    async def apply_changes(
+            cls, session: AsyncSession, old_state: AppealState | None, new_state: AppealState | None
+    ) -> None:
+        daily_changes, backlog_changes, resolution_changes = Counter(), Counter(), Counter()
+        for state, sign in ((old_state, -1), (new_state, 1)):
+            if state is None:
+                continue
+            daily_changes[(state.created_at.date(), state.status, state.responsibility_area)] += sign
+            if state.status == AppealStatus.in_progress and state.executor_id:
+                backlog_changes[str(state.executor_id)] += sign
+            # The appeals set done bypassing the service, e.g. in the admin panel, have no resolution datetime
+            if state.status == AppealStatus.done and state.resolved_at:
+                resolution_changes[state.resolution_hours] += sign
+
+        # Sorted keys keep the lock order of the statistics rows the same in concurrent transactions
+        if daily_changes := sorted((key, value) for key, value in daily_changes.items() if value):
+            await cls._increment(
+                session,
+                AppealDailyStatistics,
+                [
+                    {"day": day, "status": status, "responsibility_area": area, "count": value}
+                    for (day, status, area), value in daily_changes
+                ],
+            )
+        if backlog_changes := sorted((key, value) for key, value in backlog_changes.items() if value):
+            await cls._increment(
+                session,
+                ExecutorBacklogStatistics,
+                [{"executor_id": executor_id, "count": value} for executor_id, value in backlog_changes],
+            )
+        if resolution_changes := sorted((key, value) for key, value in resolution_changes.items() if value):
+            await cls._increment(
+                session,
+                ResolutionTimeStatistics,
+                [{"hours": hours, "count": value} for hours, value in resolution_changes],
+            )
+
+    @staticmethod
+    async def _increment(session: AsyncSession, model, values: list[dict]) -> None:
+        query = pg_insert(model).values(values)
+        query = query.on_conflict_do_update(
+            index_elements=[column.name for column in model.__table__.primary_key.columns],
+            set_={"count": model.count + query.excluded.count},
+        )
+        await session.execute(query)
+
+    @staticmethod
+    async def select_daily(session: AsyncSession, date_from: date | None, date_to: date | None) -> list[Row]:
+        query = select(
+            AppealDailyStatistics.day,
+            AppealDailyStatistics.status,
+            AppealDailyStatistics.responsibility_area,
+            AppealDailyStatistics.count,
+        ).where(AppealDailyStatistics.count != 0)
+
+        if date_from:
+            query = query.where(AppealDailyStatistics.day >= date_from)
+        if date_to:
+            query = query.where(AppealDailyStatistics.day <= date_to)
+
+        result = await session.execute(query.order_by(
+            AppealDailyStatistics.day, AppealDailyStatistics.status, AppealDailyStatistics.responsibility_area
+        ))
+        return result.all()
+
+    @staticmethod
+    async def select_executors_backlog(session: AsyncSession) -> list[Row]:
+        query = select(ExecutorBacklogStatistics.executor_id, ExecutorBacklogStatistics.count).where(
+            ExecutorBacklogStatistics.count != 0
+        )
+        result = await session.execute(query.order_by(ExecutorBacklogStatistics.executor_id))
+        return result.all()
+
+    @staticmethod
+    async def select_resolution_time(session: AsyncSession) -> list[Row]:
+        query = select(ResolutionTimeStatistics.hours, ResolutionTimeStatistics.count).where(
+            ResolutionTimeStatistics.count != 0
+        )
+        result = await session.execute(query.order_by(ResolutionTimeStatistics.hours))
+        return result.all()
+
+    @staticmethod
+    async def rebuild(session: AsyncSession) -> None:
+        models = (AppealDailyStatistics, ExecutorBacklogStatistics, ResolutionTimeStatistics)
+        # Writers wait for the rebuild, so their changes are counted either by the rebuild or after it
+        tables = ", ".join(f"{model.__table__.schema}.{model.__tablename__}" for model in models)
+        await session.execute(text(f"LOCK TABLE {tables} IN EXCLUSIVE MODE"))
+        for model in models:
+            await session.execute(delete(model))
+
+        # Archived appeals stay counted, the archive keeps only the closed ones, so the backlog is in the hot table
+        appeals = union_all(*(
+            select(model.created_at, model.resolved_at, model.status, model.responsibility_area)
+            for model in (Appeal, AppealArchive)
+        )).subquery("appeals_with_archive")
+
+        day = cast(appeals.c.created_at, Date)
+        await session.execute(insert(AppealDailyStatistics).from_select(
+            ["day", "status", "responsibility_area", "count"],
+            select(day, appeals.c.status, appeals.c.responsibility_area, func.count()).group_by(
+                day, appeals.c.status, appeals.c.responsibility_area
+            ),
+        ))
+        await session.execute(insert(ExecutorBacklogStatistics).from_select(
+            ["executor_id", "count"],
+            select(Appeal.executor_id, func.count())
+            .where(Appeal.status == AppealStatus.in_progress, Appeal.executor_id.is_not(None))
+            .group_by(Appeal.executor_id),
+        ))
+        hours = cast(func.floor(extract("epoch", appeals.c.resolved_at - appeals.c.created_at) / 3600), Integer)
+        await session.execute(insert(ResolutionTimeStatistics).from_select(
+            ["hours", "count"],
+            select(hours, func.count())
+            .where(appeals.c.status == AppealStatus.done, appeals.c.resolved_at.is_not(None))
+            .group_by(hours),
+        ))
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+from clients.http.authorization import authorization_client
+from db.connector import DatabaseConnector
+from services.appeal import email_resolver
+from utils.auth import get_auth_cache_stats
+from utils.cache import get_cache_stats
+from utils.role_checker import allowed_for_admin
+
+# The metrics expose the internals of the service, only the admins may read them
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(allowed_for_admin)])
+
+
+@router.get("/db_pool")
+async def db_pool_metrics() -> JSONResponse:
+    """Database connection pools statistics and replication lag of the read replicas."""
+    return JSONResponse(
+        content={
+            "primary": DatabaseConnector.get_primary_pool_stats(),
+            "replicas": DatabaseConnector.get_replicas_stats(),
+        }
+    )
+
+
+@router.get("/cache")
+async def cache_metrics() -> JSONResponse:
+    """Hits and misses of the cache tiers."""
+    return JSONResponse(content=get_cache_stats())
+
+
+@router.get("/auth")
+async def auth_metrics() -> JSONResponse:
+    """Hits and misses of the verified tokens and parsed user agents caches."""
+    return JSONResponse(content=get_auth_cache_stats())
+
+
+@router.get("/http")
+async def http_metrics() -> JSONResponse:
+    """Requests and connections of the HTTP clients, connections_reused grows when keep-alive works."""
+    return JSONResponse(
+        content={"authorization": authorization_client.get_stats(), "user_emails": email_resolver.get_stats()}
+    )
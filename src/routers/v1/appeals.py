@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.engine.row import Row
 
+from common.settings import settings
 from dto.schemas.appeals import (
     AppealCreate,
     AppealListFilters,
@@ -12,6 +14,8 @@ from dto.schemas.appeals import (
 from dto.schemas.users import JWTUserData
 from services.appeal import AppealService
 from utils.cache import cache
+from utils.enums import AppealResponsibilityArea, ExportFormat
+from utils.export import MEDIA_TYPES
 from utils.role_checker import allowed_for_admin_executor, allowed_for_admin_user, allowed_for_all
 
 router = APIRouter(prefix="/appeals", tags=["Appeal"])
@@ -24,16 +28,74 @@ async def create(
     return await AppealService.create(appeal_data, user_data.id)
 
 
+@router.post(
+    "/claim",
+    response_model=AppealResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Claim the oldest accepted appeal",
+)
+async def claim(
+        responsibility_area: AppealResponsibilityArea | None = None,
+        executor_id: str | None = None,
+        user_data: JWTUserData = Depends(allowed_for_admin_executor),
+) -> Row:
+    return await AppealService.claim_one(executor_id, user_data, responsibility_area)
+
+
+@router.post(
+    "/claim/batch",
+    response_model=list[AppealResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Claim the oldest accepted appeals",
+)
+async def claim_batch(
+        count: int = Query(default=10, gt=0, le=settings.APPEALS_CLAIM_MAX_COUNT),
+        responsibility_area: AppealResponsibilityArea | None = None,
+        executor_id: str | None = None,
+        user_data: JWTUserData = Depends(allowed_for_admin_executor),
+) -> list[Row]:
+    return await AppealService.claim(executor_id, user_data, responsibility_area, count)
+
+
 @router.get("/", response_model=list[AppealListResponse], summary="Get appeals list")
-@cache()
+@cache(
+    expire=settings.APPEALS_CACHE_EXPIRATION,
+    key=AppealService.get_appeals_list_cache_key,
+    tags=AppealService.get_appeals_list_cache_tags,
+    stale=settings.APPEALS_CACHE_STALE,
+    early_refresh=settings.CACHE_EARLY_REFRESH_BETA,
+    response_model=list[AppealListResponse],
+    warm=True,
+)
 async def get_appeals_list(
         filters: AppealListFilters = Depends(), user_data: JWTUserData = Depends(allowed_for_all)
 ) -> list[Row]:
     return await AppealService.get_appeals_list(filters, user_data)
 
 
+@router.get("/export", response_class=StreamingResponse, summary="Export appeals list")
+async def export_appeals_list(
+        export_format: ExportFormat = Query(default=ExportFormat.csv, alias="format"),
+        filters: AppealListFilters = Depends(),
+        user_data: JWTUserData = Depends(allowed_for_all),
+) -> StreamingResponse:
+    return StreamingResponse(
+        AppealService.export_appeals_list(filters, user_data, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename=appeals.{export_format}"},
+    )
+
+
 @router.get("/{appeal_id}", response_model=AppealResponse, summary="Get appeal detail")
-@cache()
+@cache(
+    expire=settings.APPEALS_CACHE_EXPIRATION,
+    key=AppealService.get_appeal_cache_key,
+    tags=AppealService.get_appeal_cache_tags,
+    stale=settings.APPEALS_CACHE_STALE,
+    early_refresh=settings.CACHE_EARLY_REFRESH_BETA,
+    response_model=AppealResponse,
+    negative_expire=settings.APPEALS_NEGATIVE_CACHE_EXPIRATION,
+)
 async def get_appeal(appeal_id: int, user_data: JWTUserData = Depends(allowed_for_all)) -> Row:
     return await AppealService.get_appeal(appeal_id, user_data)
 
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+
+from dto.schemas.statistics import AppealStatisticsFilters, AppealStatisticsResponse
+from dto.schemas.users import JWTUserData
+from services.statistics import StatisticsService
+from utils.role_checker import allowed_for_admin
+
+router = APIRouter(prefix="/statistics", tags=["Statistics"])
+
+
+@router.get("/appeals", response_model=AppealStatisticsResponse, summary="Get appeals statistics")
+async def get_appeals_statistics(
+        filters: AppealStatisticsFilters = Depends(), user_data: JWTUserData = Depends(allowed_for_admin)
+) -> dict:
+    return await StatisticsService.get_appeals_statistics(filters)
@@ -54,7 +54,7 @@ async def refresh_tokens(request: Request, response: Response, refresh_token: st
     summary="Get current user data",
     response_description="User data",
 )
-@cache(expire=60)
+@cache(expire=60, key=UserService.get_me_cache_key, response_model=UserBase)
 async def get_user_data(request: Request):
     return await UserService.get_me(request.cookies)
 
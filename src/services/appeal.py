@@ -1,4 +1,6 @@
 import asyncio
+import logging
+from collections.abc import AsyncIterator
 
 from fastapi import HTTPException, UploadFile, status
 from sqlalchemy.engine.row import Row
@@ -8,13 +10,36 @@ from clients.broker.rabbitmq import rmq_client
 from clients.http.authorization import authorization_client
 from clients.S3 import s3_client
 from common.settings import settings
-from db.connector import AsyncSession
-from dto.schemas.appeals import AppealCreate, AppealListFilters, ExecutorAppealUpdate, UserAppealUpdate
+from db.connector import AsyncSession, DatabaseConnector
+from dto.schemas.appeals import (
+    AppealCreate,
+    AppealListFilters,
+    ExecutorAppealUpdate,
+    UserAppealUpdate,
+)
 from dto.schemas.users import JWTUserData
 from repositories.appeal import AppealRepository
-from utils.enums import AppealStatus, LogLevel, UserRole
+from repositories.statistics import AppealState, StatisticsRepository
+from utils.batch_loader import BatchLoader
+from utils.cache import invalidate_tags
+from utils.enums import (
+    AppealResponsibilityArea,
+    AppealStatus,
+    ExportFormat,
+    LogLevel,
+    UserRole,
+)
+from utils.export import rows_to_export_format
 from utils.logging import send_log
 
+logger = logging.getLogger(__name__)
+logging.basicConfig(format=settings.LOGGING_FORMAT)
+logger.setLevel(logging.INFO)
+
+APPEALS_CACHE_TAG = "appeals"
+
+notification_tasks: set[asyncio.Task] = set()
+
 
 class AppealService:
 
@@ -29,33 +54,46 @@ class AppealService:
         appeal_data.update({"user_id": user_id, "status": AppealStatus.accepted, "photo": file_links})
 
         async with AsyncSession() as session:
-            appeal_id = await AppealRepository.insert(session, appeal_data)
+            appeal_row = await AppealRepository.insert(session, appeal_data)
+            await StatisticsRepository.apply_changes(session, None, AppealState.from_row(appeal_row))
             try:
                 await session.commit()
             except IntegrityError as e:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{e.args[0].split('DETAIL:')[1]}")
 
+        DatabaseConnector.register_write(user_id)
+        await invalidate_tags(*cls._get_write_cache_tags(appeal_row))
+
         if not settings.IS_TESTING:
             asyncio.create_task(s3_client.upload_files(filenames_photo_dict))
-            await send_log(LogLevel.info, f"Appeal created. Appeal id = {appeal_id}. User id = {user_id}")
+            await send_log(LogLevel.info, f"Appeal created. Appeal id = {appeal_row.id}. User id = {user_id}")
 
-    @staticmethod
-    async def get_appeals_list(filters: AppealListFilters, user_data: JWTUserData) -> list[Row]:
-        filters = filters.model_dump()
-
-        if filters.get("self") and user_data.role in {UserRole.user, UserRole.executor}:
-            filters.update({f"{user_data.role}_id": user_data.id})
+    @classmethod
+    async def get_appeals_list(cls, filters: AppealListFilters, user_data: JWTUserData) -> list[Row]:
+        filters = cls._get_scoped_filters(filters, user_data)
 
-        async with AsyncSession() as session:
+        async with AsyncSession(read_only=True, user_id=user_data.id) as session:
             return await AppealRepository.select_appeals_list(session, filters)
 
+    @classmethod
+    async def export_appeals_list(
+            cls, filters: AppealListFilters, user_data: JWTUserData, export_format: ExportFormat
+    ) -> AsyncIterator[str]:
+        filters = cls._get_scoped_filters(filters, user_data)
 
-    @staticmethod
-    async def get_appeal(appeal_id: int, user_data: JWTUserData) -> Row:
-        user_id = user_data.id if user_data.role == UserRole.user else None
+        async with AsyncSession(read_only=True, user_id=user_data.id) as session:
+            first_chunk = True
+            async for rows in AppealRepository.stream_appeals_list(session, filters, settings.EXPORT_CHUNK_SIZE):
+                yield rows_to_export_format(rows, export_format, first_chunk)
+                first_chunk = False
 
-        async with AsyncSession() as session:
-            appeal_row = await AppealRepository.select_appeal(session, appeal_id, user_id)
+
+    @classmethod
+    async def get_appeal(cls, appeal_id: int, user_data: JWTUserData) -> Row:
+        user_id = cls._get_appeal_user_id(user_data)
+
+        async with AsyncSession(read_only=True, user_id=user_data.id) as session:
+            appeal_row = await AppealRepository.select_appeal(session, appeal_id, user_id, include_archived=True)
 
         if not appeal_row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appeal not found")
@@ -84,6 +122,10 @@ class AppealService:
             if photo:
                 old_photo_links = await AppealRepository.select_appeals_photo(session, filters)
             appeal_row = await AppealRepository.update(session, filters, values)
+            if appeal_row:
+                await StatisticsRepository.apply_changes(
+                    session, AppealState.from_row(appeal_row, "previous_"), AppealState.from_row(appeal_row)
+                )
             try:
                 await session.commit()
             except IntegrityError as e:
@@ -92,6 +134,9 @@ class AppealService:
         if not appeal_row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appeal for update not found")
 
+        DatabaseConnector.register_write(user_data.id, appeal_row.user_id)
+        await invalidate_tags(*cls._get_write_cache_tags(appeal_row))
+
         if not settings.IS_TESTING:
             if photo:
                 photo_to_delete = [link.split("/")[-1] for link in old_photo_links[0]]
@@ -120,6 +165,10 @@ class AppealService:
 
         async with AsyncSession() as session:
             appeal_row = await AppealRepository.update(session, filters, values)
+            if appeal_row:
+                await StatisticsRepository.apply_changes(
+                    session, AppealState.from_row(appeal_row, "previous_"), AppealState.from_row(appeal_row)
+                )
             try:
                 await session.commit()
             except IntegrityError as e:
@@ -128,49 +177,61 @@ class AppealService:
         if not appeal_row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appeal for update not found")
 
+        DatabaseConnector.register_write(user_data.id, appeal_row.user_id)
+        await invalidate_tags(*cls._get_write_cache_tags(appeal_row))
+
         if not settings.IS_TESTING:
-            await cls._send_notification(
+            # The executor doesn't wait for the email lookup
+            task = asyncio.create_task(cls._send_notification(
                 appeal_row.user_id, appeal_id, executor_upd_data.status, executor_upd_data.comment
-            )
+            ))
+            notification_tasks.add(task)
+            task.add_done_callback(notification_tasks.discard)
             await send_log(
                 LogLevel.info, f"Appeal updated by executor. Appeal id = {appeal_id}. Executor id = {user_data.id}"
             )
 
         return appeal_row
 
-    @staticmethod
-    async def delete(appeal_id: int, user_data: JWTUserData) -> None:
+    @classmethod
+    async def delete(cls, appeal_id: int, user_data: JWTUserData) -> None:
         filters = {"id": appeal_id}
         if user_data.role == UserRole.user:
             filters.update({"user_id": user_data.id, "status": AppealStatus.accepted})
 
         async with AsyncSession() as session:
-            photo_links = await AppealRepository.delete(session, filters)
+            deleted_rows = await AppealRepository.delete(session, filters)
+            for appeal_row in deleted_rows:
+                await StatisticsRepository.apply_changes(session, AppealState.from_row(appeal_row), None)
             try:
                 await session.commit()
             except IntegrityError as e:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{e.args[0].split('DETAIL:')[1]}")
 
+        DatabaseConnector.register_write(user_data.id)
+        await invalidate_tags(*cls._get_write_cache_tags(*deleted_rows))
+
         if not settings.IS_TESTING:
-            if photo_links := photo_links[0]:
+            if deleted_rows and (photo_links := deleted_rows[0].photo):
                 photo_to_delete = [link.split("/")[-1] for link in photo_links]
                 asyncio.create_task(s3_client.delete_files(photo_to_delete))
 
             await send_log(LogLevel.info, f"Appeal deleted. Appeal id = {appeal_id}. User id = {user_data.id}")
 
 
-    @staticmethod
-    async def executor_assign(appeal_id: int, executor_id: str | None, user_data: JWTUserData) -> Row:
-        if user_data.role == UserRole.admin and not executor_id:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The executor's ID is required")
-        elif user_data.role == UserRole.executor:
-            executor_id = user_data.id
+    @classmethod
+    async def executor_assign(cls, appeal_id: int, executor_id: str | None, user_data: JWTUserData) -> Row:
+        executor_id = cls._get_executor_id(executor_id, user_data)
 
         filters = {"id": appeal_id, "status": AppealStatus.accepted}
         values = {"executor_id": executor_id, "status": AppealStatus.in_progress}
 
         async with AsyncSession() as session:
             appeal_row = await AppealRepository.update(session, filters, values)
+            if appeal_row:
+                await StatisticsRepository.apply_changes(
+                    session, AppealState.from_row(appeal_row, "previous_"), AppealState.from_row(appeal_row)
+                )
             try:
                 await session.commit()
             except IntegrityError as e:
@@ -179,6 +240,9 @@ class AppealService:
         if not appeal_row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appeal for assign not found")
 
+        DatabaseConnector.register_write(user_data.id, executor_id, appeal_row.user_id)
+        await invalidate_tags(*cls._get_write_cache_tags(appeal_row))
+
         if not settings.IS_TESTING:
             await send_log(
                 LogLevel.info,
@@ -187,6 +251,125 @@ class AppealService:
 
         return appeal_row
 
+    @classmethod
+    async def claim(
+            cls,
+            executor_id: str | None,
+            user_data: JWTUserData,
+            responsibility_area: AppealResponsibilityArea | None = None,
+            count: int = 1,
+    ) -> list[Row]:
+        executor_id = cls._get_executor_id(executor_id, user_data)
+
+        async with AsyncSession() as session:
+            appeal_rows = await AppealRepository.claim(session, executor_id, count, responsibility_area)
+            for appeal_row in appeal_rows:
+                await StatisticsRepository.apply_changes(
+                    session, AppealState.from_row(appeal_row, "previous_"), AppealState.from_row(appeal_row)
+                )
+            await session.commit()
+
+        if not appeal_rows:
+            return appeal_rows
+
+        DatabaseConnector.register_write(user_data.id, executor_id, *(appeal_row.user_id for appeal_row in appeal_rows))
+        await invalidate_tags(*cls._get_write_cache_tags(*appeal_rows))
+
+        if not settings.IS_TESTING:
+            appeal_ids = ", ".join(str(appeal_row.id) for appeal_row in appeal_rows)
+            await send_log(
+                LogLevel.info,
+                f"Appeals are claimed by the executor. Appeal ids = {appeal_ids}. Executor id = {executor_id}",
+            )
+
+        return appeal_rows
+
+    @classmethod
+    async def claim_one(
+            cls,
+            executor_id: str | None,
+            user_data: JWTUserData,
+            responsibility_area: AppealResponsibilityArea | None = None,
+    ) -> Row:
+        if not (appeal_rows := await cls.claim(executor_id, user_data, responsibility_area)):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No appeals to claim")
+
+        return appeal_rows[0]
+
+    @classmethod
+    async def archive_closed_appeals(
+            cls,
+            closed_days_ago: int = settings.APPEALS_ARCHIVE_AFTER_DAYS,
+            batch_size: int = settings.APPEALS_ARCHIVE_BATCH_SIZE,
+    ) -> int:
+        archived_count = 0
+        while True:
+            async with AsyncSession() as session:
+                archived_rows = await AppealRepository.archive_closed(session, closed_days_ago, batch_size)
+                await session.commit()
+
+            await invalidate_tags(*cls._get_write_cache_tags(*archived_rows))
+            archived_count += len(archived_rows)
+            if len(archived_rows) < batch_size:
+                return archived_count
+
+    @classmethod
+    def get_appeals_list_cache_tags(cls, filters: AppealListFilters, user_data: JWTUserData, **kwargs) -> list[str]:
+        scoped_filters = cls._get_scoped_filters(filters, user_data)
+        if user_id := scoped_filters.get("user_id"):
+            return [f"user:{user_id}"]
+        if executor_id := scoped_filters.get("executor_id"):
+            return [f"executor:{executor_id}"]
+        return [APPEALS_CACHE_TAG]
+
+    @classmethod
+    def get_appeals_list_cache_key(cls, filters: AppealListFilters, user_data: JWTUserData, **kwargs) -> dict:
+        """The effective filters, the same for the users who see the same list."""
+        scoped_filters = cls._get_scoped_filters(filters, user_data)
+        scoped_filters.pop("self")
+        return {name: value for name, value in scoped_filters.items() if value is not None}
+
+    @classmethod
+    def get_appeal_cache_key(cls, appeal_id: int, user_data: JWTUserData, **kwargs) -> dict:
+        return {"appeal_id": appeal_id, "user_id": cls._get_appeal_user_id(user_data)}
+
+    @staticmethod
+    def get_appeal_cache_tags(appeal_id: int, **kwargs) -> list[str]:
+        return [f"appeal:{appeal_id}"]
+
+    @staticmethod
+    def _get_write_cache_tags(*appeal_rows: Row) -> list[str]:
+        """Tags of the cached appeals and lists which may contain the written appeals."""
+        tags = [APPEALS_CACHE_TAG]
+        for appeal_row in appeal_rows:
+            tags.extend([f"appeal:{appeal_row.id}", f"user:{appeal_row.user_id}"])
+            for executor_id in (appeal_row.executor_id, getattr(appeal_row, "previous_executor_id", None)):
+                if executor_id:
+                    tags.append(f"executor:{executor_id}")
+        return tags
+
+    @staticmethod
+    def _get_executor_id(executor_id: str | None, user_data: JWTUserData) -> str:
+        if user_data.role == UserRole.admin and not executor_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The executor's ID is required")
+        elif user_data.role == UserRole.executor:
+            executor_id = user_data.id
+
+        return executor_id
+
+    @staticmethod
+    def _get_appeal_user_id(user_data: JWTUserData) -> str | None:
+        return user_data.id if user_data.role == UserRole.user else None
+
+    @staticmethod
+    def _get_scoped_filters(filters: AppealListFilters, user_data: JWTUserData) -> dict:
+        filters = filters.model_dump()
+
+        if filters.get("self") and user_data.role in {UserRole.user, UserRole.executor}:
+            filters.update({f"{user_data.role}_id": user_data.id})
+
+        return filters
+
     @classmethod
     def _get_photo_data(cls, photo_list: list[UploadFile], user_id: str) -> tuple[dict[str, bytes], list[str]]:
         filenames_photo_dict = {}
@@ -208,10 +391,40 @@ class AppealService:
         if not response:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="There is no email")
 
-        return response
+        return response.strip('"')
+
+    @classmethod
+    async def _get_users_emails(cls, user_ids: list[str]) -> dict[str, str]:
+        if settings.AUTHORIZATION_SERVICE_BATCH_EMAILS:
+            response_status, response = await authorization_client.get_users_emails(user_ids)
+            if response_status != status.HTTP_200_OK or not isinstance(response, dict):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=response)
+            return response
+
+        # A failed lookup fails only its own user, the others of the batch are still notified
+        emails = await asyncio.gather(*(cls._get_user_email(user_id) for user_id in user_ids), return_exceptions=True)
+        emails_by_user_id = {}
+        for user_id, email in zip(user_ids, emails):
+            if isinstance(email, Exception):
+                logger.warning(f"Email of the user {user_id} is not found: {email!r}")
+                continue
+            emails_by_user_id[user_id] = email
+        return emails_by_user_id
 
     @classmethod
     async def _send_notification(cls, user_id: str, appeal_id: int, appeal_status: AppealStatus, comment: str) -> None:
-        user_email = await cls._get_user_email(user_id)
-        message = {"email": user_email.strip('"'), "appeal_id": appeal_id, "status": appeal_status, "comment": comment}
-        await rmq_client.send_notification(message)
+        try:
+            user_email = await email_resolver.load(str(user_id))
+            message = {"email": user_email, "appeal_id": appeal_id, "status": appeal_status, "comment": comment}
+            await rmq_client.send_notification(message)
+        except Exception:
+            logger.exception(f"Notification about the appeal {appeal_id} is not sent")
+
+
+email_resolver = BatchLoader(
+    AppealService._get_users_emails,
+    max_entries=settings.USER_EMAIL_CACHE_MAX_ENTRIES,
+    expire=settings.USER_EMAIL_CACHE_EXPIRATION,
+    batch_size=settings.USER_EMAIL_BATCH_SIZE,
+    batch_delay=settings.USER_EMAIL_BATCH_DELAY,
+)
@@ -0,0 +1,47 @@
+from collections import Counter
+
+from sqlalchemy.engine.row import Row
+
+from db.connector import AsyncSession
+from dto.schemas.statistics import AppealStatisticsFilters
+from repositories.statistics import StatisticsRepository
+
+
+class StatisticsService:
+
+    @classmethod
+    async def get_appeals_statistics(cls, filters: AppealStatisticsFilters) -> dict:
+        async with AsyncSession(read_only=True) as session:
+            daily_rows = await StatisticsRepository.select_daily(session, filters.date_from, filters.date_to)
+            backlog_rows = await StatisticsRepository.select_executors_backlog(session)
+            resolution_rows = await StatisticsRepository.select_resolution_time(session)
+
+        by_status, by_responsibility_area = Counter(), Counter()
+        for row in daily_rows:
+            by_status[row.status] += row.count
+            by_responsibility_area[row.responsibility_area] += row.count
+
+        return {
+            "by_status": by_status,
+            "by_responsibility_area": by_responsibility_area,
+            "by_day": daily_rows,
+            "executors_backlog": [{"executor_id": str(row.executor_id), "count": row.count} for row in backlog_rows],
+            "median_resolution_hours": cls._get_median_hours(resolution_rows),
+        }
+
+    @staticmethod
+    async def rebuild() -> None:
+        async with AsyncSession() as session:
+            await StatisticsRepository.rebuild(session)
+            await session.commit()
+
+    @staticmethod
+    def _get_median_hours(resolution_rows: list[Row]) -> int | None:
+        """Median of the resolution time histogram, rows are ordered by hours."""
+        total = sum(row.count for row in resolution_rows)
+        cumulative = 0
+        for row in resolution_rows:
+            cumulative += row.count
+            if cumulative * 2 >= total:
+                return row.hours
+        return None
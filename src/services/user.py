@@ -71,6 +71,11 @@ class UserService:
         response.set_cookie(key="access_token", value=response_dict.get("access_token"), httponly=True)
         return dict(refresh_token=response_dict.get("refresh_token"))
 
+    @staticmethod
+    def get_me_cache_key(request: Request, **kwargs) -> dict:
+        # The token is validated by the authorization service on a miss only, so the entry is per token, not per user
+        return {"access_token": request.cookies.get("access_token")}
+
     @staticmethod
     async def get_me(cookies: dict) -> dict:
         response_status, response_dict = await authorization_client.get_me(cookies)
@@ -1,9 +1,17 @@
+import time
+from hashlib import sha256
+
 import jwt
 from fastapi import Depends, HTTPException, Request, status
 from user_agents import parse
 
 from common.settings import settings
 from utils.enums import TokenType, UserRole
+from utils.lru import LRUCache
+
+# Claims of the verified access tokens by the token digest, until the token expiration at most
+verified_tokens = LRUCache(settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
+parsed_user_agents = LRUCache(settings.USER_AGENT_CACHE_MAX_ENTRIES)
 
 
 def get_token(request: Request) -> str:
@@ -19,12 +27,7 @@ def get_user_agent(request: Request):
 def get_current_user_data(
         token: str = Depends(get_token), current_user_agent: str = Depends(get_user_agent)
 ) -> dict[str, str | UserRole]:
-    check_token_type(token, TokenType.access)
-
-    try:
-        payload = jwt.decode(token, key=settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-    except jwt.PyJWTError as e:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+    payload = get_access_token_payload(token)
 
     if (
             not (role := payload.get("role")) or
@@ -33,7 +36,7 @@ def get_current_user_data(
     ):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    if str(parse(current_user_agent)) != user_agent:
+    if parse_user_agent(current_user_agent) != user_agent:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token data")
 
     try:
@@ -44,6 +47,36 @@ def get_current_user_data(
     return {"id": user_id, "role": role}
 
 
+def get_access_token_payload(token: str) -> dict:
+    token_digest = sha256(token.encode()).digest()
+    if (payload := verified_tokens.get(token_digest)) is not None:
+        return payload
+
+    check_token_type(token, TokenType.access)
+    try:
+        payload = jwt.decode(token, key=settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.PyJWTError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+    expire = settings.AUTH_TOKEN_CACHE_EXPIRATION
+    if (expires_at := payload.get("exp")) is not None:
+        expire = min(expire, expires_at - time.time())
+    if expire > 0:
+        verified_tokens.set(token_digest, payload, expire)
+    return payload
+
+
+def parse_user_agent(user_agent: str) -> str:
+    if (parsed_user_agent := parsed_user_agents.get(user_agent)) is None:
+        parsed_user_agent = str(parse(user_agent))
+        parsed_user_agents.set(user_agent, parsed_user_agent)
+    return parsed_user_agent
+
+
+def get_auth_cache_stats() -> dict:
+    return {"verified_tokens": verified_tokens.get_stats(), "user_agents": parsed_user_agents.get_stats()}
+
+
 def check_token_type(token: str, required_type: TokenType) -> None:
     header = jwt.get_unverified_header(token)
     if (token_type := header.get("typ")) and token_type != required_type:
@@ -0,0 +1,83 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from utils.lru import LRUCache
+
+
+class BatchLoader:
+    """Loads values by keys with a TTL cache in front, the lookups of a key in flight are shared by the callers.
+
+    The keys missing in the cache are collected for `batch_delay` seconds, or until `batch_size` of them,
+    and loaded by one `load_many` call, which returns the found values by their keys.
+    """
+
+    def __init__(
+            self,
+            load_many: Callable[[list[Hashable]], Awaitable[dict[Hashable, Any]]],
+            max_entries: int,
+            expire: float,
+            batch_size: int,
+            batch_delay: float,
+    ):
+        self.values = LRUCache(max_entries)
+        self.batches = 0
+        self._load_many = load_many
+        self._expire = expire
+        self._batch_size = batch_size
+        self._batch_delay = batch_delay
+        self._batch: list[Hashable] = []
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._delayed_flush: asyncio.Task | None = None
+
+    async def load(self, key: Hashable) -> Any:
+        if (value := self.values.get(key)) is not None:
+            return value
+
+        if (future := self._pending.get(key)) is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            self._batch.append(key)
+            if len(self._batch) >= self._batch_size:
+                self._run(self._flush())
+            elif self._delayed_flush is None:
+                self._delayed_flush = self._run(self._flush_later())
+
+        # A cancelled caller doesn't cancel the lookup for the others
+        return await asyncio.shield(future)
+
+    def get_stats(self) -> dict:
+        return {**self.values.get_stats(), "batches": self.batches}
+
+    def _run(self, coroutine: Awaitable) -> asyncio.Task:
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._batch_delay)
+        self._delayed_flush = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        keys, self._batch = self._batch, []
+        if not keys:
+            return
+
+        self.batches += 1
+        try:
+            values = await self._load_many(keys)
+        except Exception as e:
+            for key in keys:
+                self._pending.pop(key).set_exception(e)
+            return
+
+        for key in keys:
+            future = self._pending.pop(key)
+            if (value := values.get(key)) is None:
+                future.set_exception(LookupError(f"Nothing is found by the key {key}"))
+                continue
+            self.values.set(key, value, self._expire)
+            future.set_result(value)
@@ -1,52 +1,448 @@
 import asyncio
 import json
+import logging
+import math
+import random
+import time
+import zlib
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
 from functools import wraps
 from hashlib import sha256
-from typing import Any
+from typing import Any, NamedTuple, TypeVar
 
-from fastapi import Request
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+from redis.exceptions import RedisError
 from sqlalchemy.engine.row import Row
 
+from clients.cache.memory_client import memory_client
 from clients.cache.redis_client import redis_client
 from common.settings import settings
+from utils.cache_warmer import cache_warmer
+from utils.circuit_breaker import CircuitOpenError
+from utils.single_flight import SingleFlight
 
+logger = logging.getLogger(__name__)
+logging.basicConfig(format=settings.LOGGING_FORMAT)
+logger.setLevel(logging.INFO)
+
+T = TypeVar("T")
+
+TAG_KEY_PREFIX = "cache_tag:"
+LOCK_KEY_PREFIX = "cache_lock:"
+REFRESH_KEY_PREFIX = "refresh:"
+# A Redis failure makes the cache a pass-through for the request instead of failing it
+REDIS_ERRORS = (RedisError, OSError, CircuitOpenError)
+# Entries of another format version are treated as misses
+ENTRY_FORMAT_VERSION = 1
+# Codecs by the name stored in the entry header, a faster one may be added without breaking the stored entries
+CODECS: dict[str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, settings.CACHE_COMPRESSION_LEVEL), zlib.decompress),
+}
+
+cache_stats = Counter()
+single_flight = SingleFlight()
+background_tasks: set[asyncio.Task] = set()
+# Tags whose versions failed to be bumped, they are bumped again by `retry_invalidations` once Redis is back
+pending_invalidations: set[str] = set()
+
+
+class CacheEntry(NamedTuple):
+    body: bytes
+    created_at: float
+    compute_time: float
+    status_code: int = status.HTTP_200_OK
+    media_type: str = "application/json"
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    @property
+    def is_positive(self) -> bool:
+        return self.status_code == status.HTTP_200_OK
+
+    def get_age(self) -> float:
+        return time.time() - self.created_at
+
+    def should_refresh_early(self, expire: int, beta: float) -> bool:
+        """XFetch: the closer the expiration and the longer the computation, the likelier the early refresh."""
+        if not beta:
+            return False
+        return time.time() - self.compute_time * beta * math.log(1 - random.random()) >= self.created_at + expire
+
+    def to_response(self) -> Response:
+        return Response(content=self.body, status_code=self.status_code, media_type=self.media_type)
+
+    def dump(self, tag_versions: dict[str, int]) -> bytes:
+        """A JSON header line followed by the response body, compressed if it is bigger than the threshold."""
+        body, codec = self.body, None
+        if self.size > settings.CACHE_COMPRESSION_THRESHOLD:
+            codec = settings.CACHE_COMPRESSION_CODEC
+            body = CODECS[codec][0](body)
+            cache_stats["compressed_entries"] += 1
+            cache_stats["compressed_bytes_before"] += self.size
+            cache_stats["compressed_bytes_after"] += len(body)
+
+        header = {
+            "version": ENTRY_FORMAT_VERSION,
+            "codec": codec,
+            "tags": tag_versions,
+            "created_at": self.created_at,
+            "compute_time": self.compute_time,
+            "status_code": self.status_code,
+            "media_type": self.media_type,
+        }
+        return json.dumps(header).encode() + b"\n" + body
+
+    @classmethod
+    def load(cls, cached_data: bytes) -> tuple[dict[str, int], "CacheEntry"] | None:
+        header, separator, body = cached_data.partition(b"\n")
+        if not separator:
+            return None
+        header = json.loads(header)
+        if header.get("version") != ENTRY_FORMAT_VERSION:
+            return None
+        if codec := header["codec"]:
+            if codec not in CODECS:
+                return None
+            body = CODECS[codec][1](body)
+        return header["tags"], cls(
+            body, header["created_at"], header["compute_time"], header["status_code"], header["media_type"]
+        )
+
+
+def cache(
+        expire: int = settings.DEFAULT_CACHE_EXPIRATION,
+        tags: Callable[..., Iterable[str]] | None = None,
+        key: Callable[..., dict] | None = None,
+        stale: int = 0,
+        early_refresh: float = 0,
+        response_model: Any = None,
+        negative_expire: int = 0,
+        warm: bool = False,
+):
+    """Cache the endpoint response in Redis and, if enabled, in the in-process tier in front of it.
+
+    The response is cached as the final JSON bytes and a hit returns them as a Response, so the route
+    `response_model` doesn't apply to the cached endpoint and must be passed here instead.
+
+    `key` gets the endpoint keyword arguments and returns the data the result depends on: the effective filters
+    and the data scope of the user rather than the user, so the users seeing the same data share the entry.
+    By default it is all the keyword arguments, the endpoints with the request argument must pass `key`.
+
+    `tags` gets the endpoint keyword arguments and returns the tags of the result. The entry is valid
+    while none of its tags has been bumped by `invalidate_tags` since the entry was computed.
+
+    On a miss the result is computed once per key: concurrent callers in the process share the computation,
+    and the other workers wait up to CACHE_LOCK_WAIT for the entry of the lock holder before computing it.
+
+    An expired entry is still served for `stale` seconds while it is refreshed in the background.
+    With `early_refresh` (the XFetch beta, 1 is a good default) a fresh entry may be refreshed in the background
+    shortly before its expiration. Entries with bumped tags are never served.
+
+    With `negative_expire` the 404 responses are cached for that many seconds, without the stale period.
+    The tags of such an entry should be bumped when the missing object appears.
+
+    With `warm` the most requested entries are recomputed at startup and after their tags are invalidated.
+    """
+    type_adapter = TypeAdapter(response_model) if response_model is not None else None
 
-def cache(expire: int = settings.DEFAULT_CACHE_EXPIRATION):
     def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            if settings.IS_TESTING:
-                return await func(*args, **kwargs)
+        name = f"{func.__module__}.{func.__name__}"
+
+        def get_cache_key(kwargs: dict) -> str:
+            return create_cache_key(func.__name__, (key or get_default_key_data)(**kwargs))
+
+        async def serve(cache_key: str, /, **kwargs) -> Response:
+            entry_tags = sorted(set(tags(**kwargs))) if tags else []
+
+            async def compute() -> tuple[bytes, int]:
+                try:
+                    return render_json(await func(**kwargs), type_adapter), status.HTTP_200_OK
+                except HTTPException as e:
+                    if not negative_expire or e.status_code != status.HTTP_404_NOT_FOUND:
+                        raise
+                    cache_stats["negative_entries"] += 1
+                    return render_json({"detail": e.detail}), e.status_code
 
-            key = create_cache_key(func.__name__, *args, **kwargs)
+            invalidations_count = memory_client.invalidations_count
+            if settings.LOCAL_CACHE_ENABLED and (entry := await memory_client.get(cache_key)) is not None:
+                return entry.to_response()
 
-            if cached_data := await redis_client.get(key):
-                return json.loads(cached_data)
+            entry = await call_redis(get_redis_entry(cache_key, entry_tags))
+            entry_expire, entry_stale = (expire, stale) if entry and entry.is_positive else (negative_expire, 0)
+            if entry and (age := entry.get_age()) < entry_expire + entry_stale:
+                if age >= entry_expire:
+                    cache_stats["stale_hits"] += 1
+                    schedule_refresh(cache_key, entry_tags, expire, stale, negative_expire, compute)
+                    return entry.to_response()
 
-            data =  await func(*args, **kwargs)
-            data = transform_data(data)
-            asyncio.create_task(redis_client.set(key, json.dumps(data), expire))
-            return data
+                cache_stats["redis_hits"] += 1
+                if entry.should_refresh_early(entry_expire, early_refresh):
+                    cache_stats["early_refreshes"] += 1
+                    schedule_refresh(cache_key, entry_tags, expire, stale, negative_expire, compute)
+                else:
+                    await set_local(cache_key, entry, entry_tags, invalidations_count, entry_expire - age)
+                return entry.to_response()
+            cache_stats["redis_misses"] += 1
 
+            async def load() -> CacheEntry:
+                entry = await compute_entry(cache_key, entry_tags, expire, stale, negative_expire, compute)
+                await set_local(
+                    cache_key, entry, entry_tags, invalidations_count, expire if entry.is_positive else negative_expire
+                )
+                return entry
+
+            # Every caller gets its own Response, the middlewares may modify the headers
+            entry = await single_flight.run(cache_key, load)
+            return entry.to_response()
+
+        @wraps(func)
+        async def wrapper(**kwargs):
+            if settings.IS_TESTING:
+                return await func(**kwargs)
+
+            cache_key = get_cache_key(kwargs)
+            if warm:
+                cache_warmer.record(name, cache_key, kwargs)
+            return await serve(cache_key, **kwargs)
+
+        if warm:
+            cache_warmer.register(name, func, lambda **kwargs: serve(get_cache_key(kwargs), **kwargs), tags)
         return wrapper
     return decorator
 
 
-def create_cache_key(func_name: str, *args, **kwargs) -> str:
-    for key, value in kwargs.items():
-        if isinstance(value, Request):
-            kwargs[key] = value.get("headers")
-            break
+def render_json(data: Any, type_adapter: TypeAdapter | None = None) -> bytes:
+    if type_adapter is None:
+        return to_json(transform_data(data))
+    return type_adapter.dump_json(type_adapter.validate_python(data, from_attributes=True), by_alias=True)
+
 
-    data = f"{func_name}_{args}_{kwargs}"
+async def get_redis_entry(key: str, tags: list[str]) -> CacheEntry | None:
+    # The worker that failed to invalidate the tags does not serve their entries until the bump succeeds
+    if pending_invalidations.intersection(tags):
+        return None
+    if (cached_data := await redis_client.get(key)) and (loaded := CacheEntry.load(cached_data)):
+        tag_versions, entry = loaded
+        if not tags or tag_versions == await get_tag_versions(tags):
+            return entry
+
+
+async def compute_entry(
+        key: str,
+        tags: list[str],
+        expire: int,
+        stale: int,
+        negative_expire: int,
+        compute: Callable[[], Awaitable[tuple[bytes, int]]],
+) -> CacheEntry:
+    lock_key = LOCK_KEY_PREFIX + key
+    # An empty token means Redis is unavailable, the entry is computed without the lock then
+    lock_token = await call_redis(redis_client.acquire_lock(lock_key, settings.CACHE_LOCK_EXPIRATION), default="")
+    if lock_token is None and (entry := await wait_for_redis_entry(key, tags)):
+        return entry
+
+    try:
+        return await store_entry(key, tags, expire, stale, negative_expire, compute)
+    finally:
+        if lock_token:
+            await call_redis(redis_client.release_lock(lock_key, lock_token))
+
+
+async def store_entry(
+        key: str,
+        tags: list[str],
+        expire: int,
+        stale: int,
+        negative_expire: int,
+        compute: Callable[[], Awaitable[tuple[bytes, int]]],
+) -> CacheEntry:
+    # Versions are taken before the computation, so a write during it makes the entry stale at once
+    tag_versions = await call_redis(get_tag_versions(tags)) if tags else {}
+    created_at = time.time()
+    body, status_code = await compute()
+    entry = CacheEntry(body, created_at, time.time() - created_at, status_code)
+
+    if tag_versions is None:
+        return entry
+    if entry.size > settings.CACHE_MAX_ENTRY_SIZE:
+        cache_stats["oversized_entries"] += 1
+        return entry
+    ttl = expire + stale if entry.is_positive else negative_expire
+    await call_redis(redis_client.set(key, entry.dump(tag_versions), ttl))
+    return entry
+
+
+def schedule_refresh(
+        key: str,
+        tags: list[str],
+        expire: int,
+        stale: int,
+        negative_expire: int,
+        compute: Callable[[], Awaitable[tuple[bytes, int]]],
+) -> None:
+    async def refresh() -> None:
+        lock_key = LOCK_KEY_PREFIX + key
+        # Another worker holding the lock is refreshing the entry already
+        if not (lock_token := await call_redis(redis_client.acquire_lock(lock_key, settings.CACHE_LOCK_EXPIRATION))):
+            return
+        try:
+            await store_entry(key, tags, expire, stale, negative_expire, compute)
+        except Exception:
+            logger.exception(f"Cache refresh of the key {key} failed")
+        finally:
+            await call_redis(redis_client.release_lock(lock_key, lock_token))
+
+    task = asyncio.create_task(single_flight.run(REFRESH_KEY_PREFIX + key, refresh))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+async def wait_for_redis_entry(key: str, tags: list[str]) -> CacheEntry | None:
+    """Wait for the entry computed by the lock holder in another worker."""
+    cache_stats["lock_waits"] += 1
+    deadline = asyncio.get_running_loop().time() + settings.CACHE_LOCK_WAIT
+    while asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+        try:
+            entry = await get_redis_entry(key, tags)
+        except REDIS_ERRORS:
+            cache_stats["redis_errors"] += 1
+            return None
+        if entry:
+            cache_stats["lock_wait_hits"] += 1
+            return entry
+
+    cache_stats["lock_wait_timeouts"] += 1
+
+
+async def set_local(key: str, entry: CacheEntry, tags: list[str], invalidations_count: int, expire: float) -> None:
+    # The entry may be stale if an invalidation message came while it was being fetched
+    if (
+            settings.LOCAL_CACHE_ENABLED
+            and entry.size <= settings.CACHE_MAX_ENTRY_SIZE
+            and memory_client.invalidations_count == invalidations_count
+    ):
+        await memory_client.set(key, entry, min(settings.LOCAL_CACHE_EXPIRATION, expire), tags, entry.size)
+
+
+async def get_tag_versions(tags: list[str]) -> dict[str, int]:
+    versions = await redis_client.get_many([TAG_KEY_PREFIX + tag for tag in tags])
+    return {tag: int(version or 0) for tag, version in zip(tags, versions)}
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """Make stale all the cache entries with any of the tags, in Redis and in the in-process tiers of all workers."""
+    if settings.IS_TESTING or not tags:
+        return
+
+    tags = sorted(set(tags))
+    await bump_tag_versions(tags)
+    if settings.LOCAL_CACHE_ENABLED:
+        memory_client.invalidate_tags(tags)
+        # Without the message the other workers clear their local tiers on resubscribing
+        await call_redis(redis_client.publish(settings.CACHE_INVALIDATION_CHANNEL, json.dumps(tags)))
+    if settings.CACHE_WARM_ENABLED:
+        cache_warmer.schedule(tags)
+
+
+async def bump_tag_versions(tags: Iterable[str]) -> None:
+    """Bump the versions of the tags along with the pending ones, the tags are kept pending if Redis fails."""
+    tags = sorted(pending_invalidations.union(tags))
+    pending_invalidations.difference_update(tags)
+    try:
+        await redis_client.incr_many([TAG_KEY_PREFIX + tag for tag in tags], settings.CACHE_TAG_EXPIRATION)
+    except REDIS_ERRORS:
+        # Until the retry the other workers may serve the entries, for no longer than their expiration and stale period
+        pending_invalidations.update(tags)
+        cache_stats["redis_errors"] += 1
+        logger.exception(f"Cache invalidation of the tags {tags} failed")
+
+
+async def retry_invalidations() -> None:
+    """Bump the tag versions that failed to be bumped while Redis was unavailable."""
+    while True:
+        await asyncio.sleep(settings.CACHE_INVALIDATION_RETRY_INTERVAL)
+        if pending_invalidations:
+            await bump_tag_versions([])
+
+
+async def listen_invalidations() -> None:
+    """Evict the in-process entries invalidated by the other workers."""
+    while True:
+        try:
+            async for message in redis_client.subscribe(settings.CACHE_INVALIDATION_CHANNEL):
+                memory_client.invalidate_tags(json.loads(message))
+        except (RedisError, OSError):
+            logger.exception("Cache invalidation subscription failed")
+            await asyncio.sleep(1)
+        # Invalidation messages may have been missed while unsubscribed
+        memory_client.clear()
+
+
+async def call_redis(coroutine: Awaitable[T], default: T | None = None) -> T | None:
+    try:
+        return await coroutine
+    except REDIS_ERRORS:
+        cache_stats["redis_errors"] += 1
+        return default
+
+
+def get_cache_stats() -> dict:
+    bytes_before, bytes_after = cache_stats["compressed_bytes_before"], cache_stats["compressed_bytes_after"]
+    return {
+        "local": memory_client.get_stats(),
+        "redis": {
+            "hits": cache_stats["redis_hits"],
+            "misses": cache_stats["redis_misses"],
+            "stale_hits": cache_stats["stale_hits"],
+            "early_refreshes": cache_stats["early_refreshes"],
+            "oversized_entries": cache_stats["oversized_entries"],
+            "negative_entries": cache_stats["negative_entries"],
+            "errors": cache_stats["redis_errors"],
+            "pending_invalidations": len(pending_invalidations),
+            "circuit_breaker": redis_client.breaker.get_stats(),
+        },
+        "warming": cache_warmer.get_stats(),
+        "compression": {
+            "entries": cache_stats["compressed_entries"],
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "ratio": round(bytes_before / bytes_after, 2) if bytes_after else None,
+        },
+        "stampede_protection": {
+            "coalesced": single_flight.coalesced,
+            "lock_waits": cache_stats["lock_waits"],
+            "lock_wait_hits": cache_stats["lock_wait_hits"],
+            "lock_wait_timeouts": cache_stats["lock_wait_timeouts"],
+        },
+    }
+
+
+def create_cache_key(func_name: str, key_data: dict) -> str:
+    """Deterministic key of the endpoint result, equal for the calls which select the same data."""
+    data = json.dumps({"func": func_name, **key_data}, sort_keys=True, default=str)
     return sha256(data.encode()).hexdigest()
 
 
+def get_default_key_data(**kwargs) -> dict:
+    key_data = {}
+    for name, value in kwargs.items():
+        if isinstance(value, Request):
+            raise TypeError("Endpoints with the request argument must be cached with a `key` builder")
+        key_data[name] = value.model_dump(exclude_none=True) if isinstance(value, BaseModel) else value
+    return key_data
+
+
 def transform_data(data: Any) -> Any:
     def convert_row_to_dict(row: Row) -> dict:
         dict_data = row._asdict()
         if created_at := dict_data.get("created_at"):
-            dict_data["created_at"] = created_at.strftime("%Y-%m-%d %H:%M:%S")
+            dict_data["created_at"] = created_at.isoformat()
         return dict_data
 
     if isinstance(data, list) and all([isinstance(item, Row) for item in data]):
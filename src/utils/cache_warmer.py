@@ -0,0 +1,154 @@
+import asyncio
+import inspect
+import json
+import logging
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any, NamedTuple
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from clients.cache.redis_client import redis_client
+from common.settings import settings
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format=settings.LOGGING_FORMAT)
+logger.setLevel(logging.INFO)
+
+HOT_KEYS_KEY = "cache_warm:hot"
+
+
+class WarmedEndpoint(NamedTuple):
+    serve: Callable[..., Awaitable[Any]]
+    parameters: dict[str, inspect.Parameter]
+    tags: Callable[..., Iterable[str]] | None
+
+
+class CacheWarmer:
+    """Recomputes the most requested entries of the warmed endpoints at startup and after their invalidation.
+
+    The requests are counted per cache key in the process and periodically added to the decaying counts in Redis
+    shared by all workers, with the keyword arguments of a request to recompute the entry with.
+    """
+
+    def __init__(self):
+        self._endpoints: dict[str, WarmedEndpoint] = {}
+        self._counts = Counter()
+        self._kwargs: dict[str, tuple[str, dict]] = {}
+        self._pending_tags: set[str] = set()
+        self._warm_task: asyncio.Task | None = None
+        self.warmed = 0
+        self.skipped = 0
+
+    def register(
+            self, name: str, func: Callable, serve: Callable[..., Awaitable[Any]], tags: Callable | None
+    ) -> None:
+        self._endpoints[name] = WarmedEndpoint(serve, dict(inspect.signature(func).parameters), tags)
+
+    def record(self, name: str, cache_key: str, kwargs: dict) -> None:
+        # Bounds the memory between the flushes when the requests have many distinct arguments
+        if cache_key not in self._counts and len(self._counts) >= settings.CACHE_WARM_TRACKED_KEYS * 10:
+            return
+        self._counts[cache_key] += 1
+        self._kwargs[cache_key] = (name, kwargs)
+
+    async def flush(self) -> None:
+        counts, kwargs, self._counts, self._kwargs = self._counts, self._kwargs, Counter(), {}
+        increments = {}
+        for cache_key, count in counts.most_common(settings.CACHE_WARM_TRACKED_KEYS):
+            name, endpoint_kwargs = kwargs[cache_key]
+            member = {"endpoint": name, "kwargs": to_jsonable_python(endpoint_kwargs)}
+            increments[json.dumps(member, sort_keys=True)] = count
+
+        if increments:
+            await redis_client.increment_scores(
+                HOT_KEYS_KEY,
+                increments,
+                settings.CACHE_WARM_DECAY,
+                settings.CACHE_WARM_TRACKED_KEYS,
+                settings.CACHE_WARM_STATS_EXPIRATION,
+            )
+
+    async def run(self) -> None:
+        """Flush the request counts to Redis periodically."""
+        while True:
+            await asyncio.sleep(settings.CACHE_WARM_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Cache warming statistics flush failed")
+
+    async def warm(self, tags: set[str] | None = None) -> None:
+        """Recompute the hot entries, only those with any of the `tags` if they are given."""
+        semaphore = asyncio.Semaphore(settings.CACHE_WARM_CONCURRENCY)
+
+        async def warm_entry(endpoint: WarmedEndpoint, kwargs: dict) -> None:
+            async with semaphore:
+                try:
+                    await endpoint.serve(**kwargs)
+                    self.warmed += 1
+                except Exception:
+                    logger.exception("Cache warming request failed")
+
+        try:
+            members = await redis_client.get_top_members(HOT_KEYS_KEY, settings.CACHE_WARM_KEYS)
+        except Exception:
+            logger.exception("Cache warming hot keys fetch failed")
+            return
+
+        requests, stale_members = [], []
+        for member in members:
+            try:
+                loaded_member = json.loads(member)
+                if (endpoint := self._endpoints.get(loaded_member["endpoint"])) is None:
+                    continue
+                kwargs = self._load_kwargs(endpoint, loaded_member["kwargs"])
+                if tags is None or (endpoint.tags and tags.intersection(endpoint.tags(**kwargs))):
+                    requests.append(warm_entry(endpoint, kwargs))
+            except Exception:
+                # E.g. the arguments recorded before the endpoint signature changed
+                logger.exception(f"Cache warming hot key {member!r} is skipped")
+                stale_members.append(member)
+        self.skipped += len(stale_members)
+
+        await asyncio.gather(*requests)
+        if stale_members:
+            try:
+                await redis_client.remove_members(HOT_KEYS_KEY, stale_members)
+            except Exception:
+                logger.exception("Cache warming stale hot keys removal failed")
+
+    def schedule(self, tags: Iterable[str]) -> None:
+        """Warm the entries of the invalidated tags after a delay, which coalesces the invalidations of a burst."""
+        if not self._endpoints:
+            return  # No warmed endpoints in the process, e.g. in a command
+        self._pending_tags.update(tags)
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = asyncio.create_task(self._warm_pending())
+
+    def get_stats(self) -> dict:
+        return {
+            "endpoints": len(self._endpoints),
+            "recorded_keys": len(self._counts),
+            "warmed": self.warmed,
+            "skipped": self.skipped,
+        }
+
+    async def _warm_pending(self) -> None:
+        while self._pending_tags:
+            await asyncio.sleep(settings.CACHE_WARM_DELAY)
+            tags, self._pending_tags = self._pending_tags, set()
+            await self.warm(tags)
+
+    @staticmethod
+    def _load_kwargs(endpoint: WarmedEndpoint, kwargs: dict) -> dict:
+        loaded_kwargs = {}
+        for name, value in kwargs.items():
+            annotation = endpoint.parameters[name].annotation
+            is_model = inspect.isclass(annotation) and issubclass(annotation, BaseModel)
+            loaded_kwargs[name] = annotation.model_validate(value) if is_model else value
+        return loaded_kwargs
+
+
+cache_warmer = CacheWarmer()
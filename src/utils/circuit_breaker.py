@@ -0,0 +1,88 @@
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from common.settings import settings
+from utils.enums import CircuitState
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format=settings.LOGGING_FORMAT)
+logger.setLevel(logging.INFO)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Fails the calls fast after `failure_threshold` consecutive failures of a dependency.
+
+    After `recovery_timeout` seconds a single probe call is let through, its success closes the circuit
+    and its failure opens it again.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int,
+            recovery_timeout: float,
+            errors: tuple[type[BaseException], ...] = (Exception,),
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.errors = errors
+        self.state = CircuitState.closed
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        is_probe = self._before_call()
+        try:
+            yield
+        except self.errors:
+            self._on_failure(is_probe)
+            raise
+        except BaseException:
+            if is_probe:
+                self._probe_in_flight = False
+            raise
+        else:
+            self._on_success(is_probe)
+
+    def get_stats(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "trips": self.trips, "rejected": self.rejected}
+
+    def _before_call(self) -> bool:
+        if self.state == CircuitState.open and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self.state = CircuitState.half_open
+        if self.state == CircuitState.closed:
+            return False
+        if self.state == CircuitState.half_open and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        self.rejected += 1
+        raise CircuitOpenError(f"Circuit breaker {self.name} is open")
+
+    def _on_success(self, is_probe: bool) -> None:
+        self.failures = 0
+        if is_probe:
+            self._probe_in_flight = False
+            self.state = CircuitState.closed
+            logger.info(f"Circuit breaker {self.name} closed")
+
+    def _on_failure(self, is_probe: bool) -> None:
+        self.failures += 1
+        if is_probe:
+            self._probe_in_flight = False
+        if is_probe or (self.state == CircuitState.closed and self.failures >= self.failure_threshold):
+            self.state = CircuitState.open
+            self._opened_at = time.monotonic()
+            self.trips += 1
+            logger.warning(f"Circuit breaker {self.name} opened after {self.failures} consecutive failures")
@@ -30,3 +30,20 @@ class LogLevel(StrEnum):
     warning = "WARNING"
     error = "ERROR"
     critical = "CRITICAL"
+
+class ReplicaSelectionStrategy(StrEnum):
+    round_robin = "round_robin"
+    least_busy = "least_busy"
+
+class AppealSortField(StrEnum):
+    id = "id"
+    created_at = "created_at"
+
+class ExportFormat(StrEnum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+class CircuitState(StrEnum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
@@ -0,0 +1,37 @@
+import csv
+import io
+import json
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy.engine.row import Row
+
+from utils.enums import ExportFormat
+
+MEDIA_TYPES = {ExportFormat.csv: "text/csv", ExportFormat.ndjson: "application/x-ndjson"}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def rows_to_csv(rows: Sequence[Row], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header and rows:
+        writer.writerow(rows[0]._fields)
+    for row in rows:
+        writer.writerow(value.isoformat() if isinstance(value, datetime) else value for value in row)
+    return buffer.getvalue()
+
+
+def rows_to_ndjson(rows: Sequence[Row]) -> str:
+    return "".join(json.dumps(row._asdict(), default=_json_default, ensure_ascii=False) + "\n" for row in rows)
+
+
+def rows_to_export_format(rows: Sequence[Row], export_format: ExportFormat, first_chunk: bool = False) -> str:
+    if export_format == ExportFormat.csv:
+        return rows_to_csv(rows, header=first_chunk)
+    return rows_to_ndjson(rows)
@@ -0,0 +1,38 @@
+import math
+from collections.abc import Sequence
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """Counts of the observed values by the upper bounds of the buckets, cumulative as in Prometheus."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = (*sorted(buckets), math.inf)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def get_percentile(self, quantile: float) -> float:
+        """Upper bound of the bucket with the quantile, the largest finite bound for the values above them."""
+        total = 0
+        for bound, count in zip(self.buckets[:-1], self.counts):
+            total += count
+            if total >= quantile * self.count:
+                return bound
+        return self.buckets[-2]
+
+    def get_stats(self) -> dict:
+        cumulative_counts, total = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            cumulative_counts["+Inf" if bound == math.inf else str(bound)] = total
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": cumulative_counts}
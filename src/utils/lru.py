@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class LRUCache:
+    """Least recently used cache bounded by the entries count and, optionally, by the total entries size.
+
+    Entries set with `expire` are dropped on the first access after `expire` seconds.
+    """
+
+    def __init__(
+            self,
+            max_entries: int,
+            max_size: int | None = None,
+            size_of: Callable[[Any], int] = lambda value: 1,
+            on_evict: Callable[[Hashable, Any], None] | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size_of = size_of
+        self._on_evict = on_evict
+        self._entries: OrderedDict[Hashable, tuple[Any, int, float | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if (entry := self._entries.get(key)) is None:
+            self.misses += 1
+            return default
+
+        value, _, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, expire: float | None = None) -> None:
+        size = self._size_of(value)
+        if self.max_size is not None and size > self.max_size:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, size, time.monotonic() + expire if expire is not None else None)
+        self.size += size
+
+        while len(self._entries) > self.max_entries or (self.max_size is not None and self.size > self.max_size):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self._remove(key)
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        value, size, _ = self._entries.pop(key)
+        self.size -= size
+        if self._on_evict:
+            self._on_evict(key, value)
@@ -0,0 +1,16 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(appeal_id: int, created_at: datetime) -> str:
+    data = json.dumps({"id": appeal_id, "created_at": created_at.isoformat()}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, datetime]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(data["id"]), datetime.fromisoformat(data["created_at"])
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
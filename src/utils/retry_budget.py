@@ -0,0 +1,22 @@
+class RetryBudget:
+    """Allows the retries to be at most a `ratio` of the requests, so that retries don't multiply the load of
+    a struggling dependency.
+
+    Every request adds `ratio` of a token and every retry takes a whole one, `max_tokens` allow a burst of retries.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1
+        return True
@@ -0,0 +1,26 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one execution of the function.
+
+    The execution runs in its own task, so a cancelled caller doesn't cancel it for the others.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        if (task := self._tasks.get(key)) is None:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
@@ -1,3 +1,7 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
 from random import choice
 from uuid import uuid4
 
@@ -6,8 +10,11 @@ from fastapi import status
 from sqlalchemy import insert, select
 
 from db.connector import AsyncSession
-from db.tables.appeals import Appeal
-from utils.enums import AppealResponsibilityArea, AppealStatus
+from db.tables.appeals import Appeal, AppealArchive
+from repositories.appeal import AppealRepository
+from services.appeal import AppealService
+from utils.enums import AppealResponsibilityArea, AppealSortField, AppealStatus, ExportFormat
+from utils.pagination import encode_cursor
 
 
 @pytest.mark.parametrize(
@@ -297,3 +304,231 @@ async def test_executor_assign(
     assert response_json.get("id") == insert_result
     assert str(select_result.executor_id) == executor_data.get("id")
     assert response_json.get("status") == new_appeal_status == select_result.status
+
+
+@pytest.mark.parametrize(
+    "count, limit, sort_by, expected_status",
+    [
+        (5, 2, AppealSortField.id, status.HTTP_200_OK),
+        (5, 2, AppealSortField.created_at, status.HTTP_200_OK),
+        (4, 4, AppealSortField.id, status.HTTP_200_OK),
+    ]
+)
+async def test_get_appeals_list_by_cursor(client, user_data, count, limit, sort_by, expected_status):
+    values = [
+        {
+            "user_id": user_data.get("id"),
+            "message": f"test_get_appeals_list_by_cursor_message_{i}",
+            "responsibility_area": AppealResponsibilityArea.road,
+            "status": AppealStatus.accepted,
+        }
+        for i in range(count)
+    ]
+    async with AsyncSession() as session:
+        result = await session.execute(insert(Appeal).values(values).returning(Appeal.id))
+        await session.commit()
+        result = result.scalars().all()
+
+    appeal_ids = []
+    params = {"limit": limit, "sort_by": sort_by, "self": True}
+    while True:
+        response = client.get(
+            "/api/v1/appeals/", params=params, cookies={"access_token": user_data.get("access_token")}
+        )
+        response_json = response.json()
+        assert response.status_code == expected_status
+        if not response_json:
+            break
+        appeal_ids.extend(item.get("id") for item in response_json)
+        params["cursor"] = response_json[-1].get("next_cursor")
+
+    assert appeal_ids == result
+
+
+@pytest.mark.parametrize(
+    "count, export_format, expected_status",
+    [
+        (3, ExportFormat.csv, status.HTTP_200_OK),
+        (3, ExportFormat.ndjson, status.HTTP_200_OK),
+    ]
+)
+async def test_export_appeals_list(client, user_data, count, export_format, expected_status):
+    messages = [f"test_export_appeals_list_message_{i}" for i in range(count)]
+    values = [
+        {
+            "user_id": user_data.get("id"),
+            "message": msg,
+            "responsibility_area": AppealResponsibilityArea.housing,
+            "status": AppealStatus.accepted,
+        }
+        for msg in messages
+    ]
+    async with AsyncSession() as session:
+        result = await session.execute(insert(Appeal).values(values).returning(Appeal.id))
+        await session.commit()
+        result = result.scalars().all()
+    params = {"format": export_format, "self": True}
+
+    response = client.get(
+        "/api/v1/appeals/export", params=params, cookies={"access_token": user_data.get("access_token")}
+    )
+
+    if export_format == ExportFormat.csv:
+        exported = list(csv.DictReader(io.StringIO(response.text)))
+    else:
+        exported = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == expected_status
+    assert [int(item.get("id")) for item in exported] == result
+    assert [item.get("message") for item in exported] == messages
+
+
+@pytest.mark.parametrize(
+    "q, expected_indexes, expected_status",
+    [
+        ("pothole", [0, 1], status.HTTP_200_OK),
+        ("streetli", [2], status.HTTP_200_OK),
+        ("100%_sure", [], status.HTTP_200_OK),
+    ]
+)
+async def test_search_appeals_list(client, user_data, q, expected_indexes, expected_status):
+    messages = [
+        "test_search_appeals_list: a pothole on the road, the pothole is huge",
+        "test_search_appeals_list: one more pothole near the school",
+        "test_search_appeals_list: the streetlight is broken near the park",
+    ]
+    values = [
+        {
+            "user_id": user_data.get("id"),
+            "message": msg,
+            "responsibility_area": AppealResponsibilityArea.road,
+            "status": AppealStatus.accepted,
+        }
+        for msg in messages
+    ]
+    values.append({**values[0], "user_id": str(uuid4())})
+    async with AsyncSession() as session:
+        result = await session.execute(insert(Appeal).values(values).returning(Appeal.id))
+        await session.commit()
+        result = result.scalars().all()
+    params = {"q": q, "self": True}
+
+    response = client.get("/api/v1/appeals/", params=params, cookies={"access_token": user_data.get("access_token")})
+
+    assert response.status_code == expected_status
+    assert [item.get("id") for item in response.json()] == [result[i] for i in expected_indexes]
+
+
+async def test_search_appeals_list_by_cursor(client, user_data):
+    params = {"q": "pothole", "cursor": encode_cursor(1, datetime.now())}
+
+    response = client.get("/api/v1/appeals/", params=params, cookies={"access_token": user_data.get("access_token")})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_archive_closed_appeals(client, user_data):
+    old_datetime = datetime.now() - timedelta(days=100)
+    values = [
+        {"status": AppealStatus.done, "created_at": old_datetime, "updated_at": old_datetime},
+        {"status": AppealStatus.rejected, "created_at": old_datetime, "updated_at": old_datetime},
+        {"status": AppealStatus.done, "created_at": old_datetime, "updated_at": datetime.now()},
+        {"status": AppealStatus.in_progress, "created_at": old_datetime, "updated_at": old_datetime},
+    ]
+    for i, value in enumerate(values):
+        value.update({
+            "user_id": user_data.get("id"),
+            "message": f"test_archive_closed_appeals_message_{i}",
+            "responsibility_area": AppealResponsibilityArea.road,
+        })
+    async with AsyncSession() as session:
+        result = await session.execute(insert(Appeal).values(values).returning(Appeal.id))
+        await session.commit()
+        result = result.scalars().all()
+
+    archived_count = await AppealService.archive_closed_appeals(closed_days_ago=90, batch_size=1)
+    async with AsyncSession() as session:
+        archived_ids = await session.execute(select(AppealArchive.id).where(AppealArchive.id.in_(result)))
+        archived_ids = archived_ids.scalars().all()
+    cookies = {"access_token": user_data.get("access_token")}
+    appeal_response = client.get(f"/api/v1/appeals/{result[0]}", cookies=cookies)
+    list_response = client.get("/api/v1/appeals/", params={"self": True}, cookies=cookies)
+    archived_list_response = client.get(
+        "/api/v1/appeals/", params={"self": True, "include_archived": True}, cookies=cookies
+    )
+
+    assert archived_count >= 2
+    assert sorted(archived_ids) == result[:2]
+    assert appeal_response.status_code == status.HTTP_200_OK
+    assert appeal_response.json().get("status") == AppealStatus.done
+    assert [item.get("id") for item in list_response.json()] == result[2:]
+    assert [item.get("id") for item in archived_list_response.json()] == result
+
+
+@pytest.mark.parametrize(
+    "count, expected_status",
+    [
+        (None, status.HTTP_202_ACCEPTED),
+        (3, status.HTTP_202_ACCEPTED),
+    ]
+)
+async def test_claim(client, executor_data, count, expected_status):
+    values = [
+        {
+            "user_id": str(uuid4()),
+            "message": f"test_claim_message_{i}",
+            "responsibility_area": AppealResponsibilityArea.law_enforcement,
+            "status": AppealStatus.accepted,
+        }
+        for i in range(3)
+    ]
+    async with AsyncSession() as session:
+        await session.execute(insert(Appeal).values(values))
+        await session.commit()
+    params = {"responsibility_area": AppealResponsibilityArea.law_enforcement}
+    cookies = {"access_token": executor_data.get("access_token")}
+
+    if count is None:
+        response = client.post("/api/v1/appeals/claim", params=params, cookies=cookies)
+        claimed = [response.json()]
+    else:
+        response = client.post("/api/v1/appeals/claim/batch", params={**params, "count": count}, cookies=cookies)
+        claimed = response.json()
+    claimed_ids = [item.get("id") for item in claimed]
+    async with AsyncSession() as session:
+        select_result = await session.execute(select(Appeal).where(Appeal.id.in_(claimed_ids)))
+        select_result = select_result.scalars().all()
+
+    assert response.status_code == expected_status
+    assert len(claimed_ids) == (count or 1)
+    assert claimed_ids == sorted(claimed_ids)
+    assert all(item.get("status") == AppealStatus.in_progress for item in claimed)
+    assert all(str(appeal.executor_id) == executor_data.get("id") for appeal in select_result)
+
+
+async def test_claim_skips_locked_appeals():
+    values = [
+        {
+            "user_id": str(uuid4()),
+            "message": f"test_claim_skips_locked_appeals_message_{i}",
+            "responsibility_area": AppealResponsibilityArea.administration,
+            "status": AppealStatus.accepted,
+        }
+        for i in range(4)
+    ]
+    async with AsyncSession() as session:
+        await session.execute(insert(Appeal).values(values))
+        await session.commit()
+
+    async with AsyncSession() as first_session, AsyncSession() as second_session:
+        first_claimed = await AppealRepository.claim(
+            first_session, str(uuid4()), 2, AppealResponsibilityArea.administration
+        )
+        second_claimed = await AppealRepository.claim(
+            second_session, str(uuid4()), 2, AppealResponsibilityArea.administration
+        )
+        await first_session.rollback()
+        await second_session.rollback()
+
+    assert len(first_claimed) == len(second_claimed) == 2
+    assert not {row.id for row in first_claimed} & {row.id for row in second_claimed}
@@ -0,0 +1,29 @@
+from unittest.mock import patch
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from common.settings import settings
+from tests.utils.tokens import create_access_token
+from utils import auth
+from utils.enums import UserRole
+from utils.lru import LRUCache
+
+
+def test_verified_token_cache(monkeypatch):
+    monkeypatch.setattr(settings, "SECRET_KEY", "test_verified_token_cache_secret_key")
+    monkeypatch.setattr(settings, "ALGORITHM", "HS256")
+    monkeypatch.setattr(auth, "verified_tokens", LRUCache(10))
+    token = create_access_token(UserRole.user)["access_token"]
+
+    first_payload = auth.get_access_token_payload(token)
+    with patch.object(jwt, "decode") as decode:
+        second_payload = auth.get_access_token_payload(token)
+
+    assert second_payload == first_payload
+    decode.assert_not_called()
+    assert auth.verified_tokens.get_stats()["hits"] == 1
+    with pytest.raises(HTTPException):
+        auth.get_access_token_payload(token + "x")
+    assert len(auth.verified_tokens) == 1
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from fastapi import status
+
+from clients.http.authorization import authorization_client
+from common.settings import settings
+from services.appeal import AppealService
+from utils.batch_loader import BatchLoader
+
+
+async def test_batch_loader():
+    batches = []
+
+    async def get_users_emails(user_ids: list[str]) -> dict[str, str]:
+        batches.append(user_ids)
+        return {user_id: f"{user_id}@example.com" for user_id in user_ids if user_id != "unknown"}
+
+    loader = BatchLoader(get_users_emails, max_entries=10, expire=60, batch_size=3, batch_delay=0.01)
+
+    emails = await asyncio.gather(*(loader.load(user_id) for user_id in ("first", "second", "first")))
+    assert emails == ["first@example.com", "second@example.com", "first@example.com"]
+    assert batches == [["first", "second"]]
+
+    emails = await asyncio.gather(*(loader.load(user_id) for user_id in ("first", "third", "fourth", "fifth")))
+    assert emails == ["first@example.com", "third@example.com", "fourth@example.com", "fifth@example.com"]
+    assert batches[1:] == [["third", "fourth", "fifth"]]
+
+    with pytest.raises(LookupError):
+        await loader.load("unknown")
+
+
+async def test_batch_loader_isolates_failed_email_lookup(monkeypatch):
+    async def get_user_email(user_id: str) -> tuple:
+        if user_id == "unknown":
+            return status.HTTP_200_OK, ""
+        if user_id == "unreachable":
+            raise ConnectionError("Authorization service is unavailable")
+        return status.HTTP_200_OK, f'"{user_id}@example.com"'
+
+    monkeypatch.setattr(settings, "AUTHORIZATION_SERVICE_BATCH_EMAILS", False)
+    monkeypatch.setattr(authorization_client, "get_user_email", get_user_email)
+    loader = BatchLoader(AppealService._get_users_emails, max_entries=10, expire=60, batch_size=4, batch_delay=0.01)
+
+    emails = await asyncio.gather(
+        *(loader.load(user_id) for user_id in ("first", "unknown", "unreachable", "second")), return_exceptions=True
+    )
+
+    assert emails[0] == "first@example.com"
+    assert emails[3] == "second@example.com"
+    assert isinstance(emails[1], LookupError) and isinstance(emails[2], LookupError)
+    assert loader.batches == 1
@@ -0,0 +1,456 @@
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from pydantic_core import to_jsonable_python
+from redis.exceptions import RedisError
+
+from clients.cache.memory_client import MemoryClient
+from common.settings import settings
+from dto.schemas.appeals import AppealListFilters, AppealListResponse
+from dto.schemas.users import JWTUserData
+from services.appeal import APPEALS_CACHE_TAG, AppealService
+from tests.utils.redis import FakeRedisClient
+from utils import cache_warmer
+from utils.cache import (
+    CacheEntry,
+    background_tasks,
+    cache,
+    cache_stats,
+    create_cache_key,
+    invalidate_tags,
+    pending_invalidations,
+    render_json,
+    retry_invalidations,
+)
+from utils.cache_warmer import CacheWarmer
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.enums import AppealResponsibilityArea, AppealStatus, CircuitState, UserRole
+from utils.lru import LRUCache
+from utils.single_flight import SingleFlight
+
+
+@pytest.mark.parametrize(
+    "role, self_only, expected_prefix",
+    [
+        (UserRole.user, True, "user:"),
+        (UserRole.executor, True, "executor:"),
+        (UserRole.admin, True, None),
+        (UserRole.user, False, None),
+    ]
+)
+def test_appeals_list_cache_tags(role, self_only, expected_prefix):
+    user_data = JWTUserData(id=str(uuid4()), role=role)
+
+    tags = AppealService.get_appeals_list_cache_tags(AppealListFilters(self=self_only), user_data)
+
+    assert tags == [f"{expected_prefix}{user_data.id}" if expected_prefix else APPEALS_CACHE_TAG]
+
+
+def test_appeals_list_cache_key_is_shared_by_scope():
+    admin_data = JWTUserData(id=str(uuid4()), role=UserRole.admin)
+    executor_data = JWTUserData(id=str(uuid4()), role=UserRole.executor)
+    user_data = JWTUserData(id=str(uuid4()), role=UserRole.user)
+
+    def get_key(filters: AppealListFilters, user_data: JWTUserData) -> str:
+        return create_cache_key("get_appeals_list", AppealService.get_appeals_list_cache_key(filters, user_data))
+
+    public_key = get_key(AppealListFilters(self=True), admin_data)
+    assert get_key(AppealListFilters(self=False), admin_data) == public_key
+    assert get_key(AppealListFilters(self=False), executor_data) == public_key
+    assert get_key(AppealListFilters(self=False), user_data) == public_key
+    assert get_key(AppealListFilters(self=True), executor_data) != public_key
+    assert get_key(AppealListFilters(self=True), user_data) != get_key(
+        AppealListFilters(self=True), JWTUserData(id=str(uuid4()), role=UserRole.user)
+    )
+    assert get_key(AppealListFilters(limit=10, status=AppealStatus.done), admin_data) == get_key(
+        AppealListFilters(status=AppealStatus.done, limit=10, self=False), executor_data
+    )
+
+
+def test_write_cache_tags():
+    user_id, executor_id, previous_executor_id = uuid4(), uuid4(), uuid4()
+    appeal_row = SimpleNamespace(
+        id=1, user_id=user_id, executor_id=executor_id, previous_executor_id=previous_executor_id
+    )
+
+    tags = AppealService._get_write_cache_tags(appeal_row)
+
+    assert set(tags) == {
+        APPEALS_CACHE_TAG,
+        "appeal:1",
+        f"user:{user_id}",
+        f"executor:{executor_id}",
+        f"executor:{previous_executor_id}",
+    }
+    # Every list which may contain the appeal is invalidated
+    assert set(AppealService.get_appeal_cache_tags(appeal_id=1)) <= set(tags)
+
+
+def test_lru_cache_limits():
+    lru = LRUCache(max_entries=2, max_size=10, size_of=len)
+
+    lru.set("a", "1234")
+    lru.set("b", "1234")
+    lru.get("a")
+    lru.set("c", "1234")
+    lru.set("d", "12345678901")
+
+    assert lru.get("b") is None
+    assert lru.get("a") == lru.get("c") == "1234"
+    assert lru.get("d") is None
+    assert lru.get_stats() == {"entries": 2, "size": 8, "hits": 3, "misses": 2, "evictions": 1}
+
+
+def test_lru_cache_expiration(monkeypatch):
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1, expire=10)
+
+    monkeypatch.setattr(time, "monotonic", lambda: float("inf"))
+
+    assert lru.get("a") is None
+    assert len(lru) == 0
+
+
+async def test_memory_client_invalidation():
+    client = MemoryClient(max_entries=10, max_bytes=1024)
+    await client.set("first", [1], expire=10, tags=["appeal:1", "appeals"], size=3)
+    await client.set("second", [2], expire=10, tags=["appeal:2"], size=3)
+
+    client.invalidate_tags(["appeals"])
+
+    assert await client.get("first") is None
+    assert await client.get("second") == [2]
+    assert client.invalidations_count == 1
+
+
+async def test_single_flight_coalesces_concurrent_calls():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def load() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(single_flight.run("key", load) for _ in range(5)))
+    next_result = await single_flight.run("key", load)
+
+    assert results == [1] * 5
+    assert next_result == 2
+    assert single_flight.coalesced == 4
+
+
+async def test_single_flight_survives_cancelled_caller():
+    single_flight = SingleFlight()
+
+    async def load() -> str:
+        await asyncio.sleep(0.01)
+        return "result"
+
+    first_call = asyncio.create_task(single_flight.run("key", load))
+    await asyncio.sleep(0)
+    second_call = asyncio.create_task(single_flight.run("key", load))
+    await asyncio.sleep(0)
+    first_call.cancel()
+
+    assert await second_call == "result"
+
+
+@pytest.mark.parametrize(
+    "age, compute_time, beta, expected",
+    [
+        (10, 1, 0, False),
+        (10, 1, 1, False),
+        (299.5, 1, 1, True),
+        (299.5, 0.01, 1, False),
+    ]
+)
+def test_cache_entry_early_refresh(monkeypatch, age, compute_time, beta, expected):
+    monkeypatch.setattr(random, "random", lambda: 0.5)
+    entry = CacheEntry(body=b"[]", created_at=time.time() - age, compute_time=compute_time)
+
+    assert entry.should_refresh_early(expire=300, beta=beta) is expected
+
+
+def test_cache_entry_round_trip():
+    appeal_row = SimpleNamespace(
+        id=1,
+        message="You really need to do something",
+        responsibility_area=AppealResponsibilityArea.road,
+        status=AppealStatus.accepted,
+        comment=None,
+        created_at=datetime(2026, 10, 18, 12, 0),
+    )
+    body = render_json([appeal_row], TypeAdapter(list[AppealListResponse]))
+    entry = CacheEntry(body=body, created_at=time.time(), compute_time=0.1)
+
+    tag_versions, loaded_entry = CacheEntry.load(entry.dump({"appeals": 3}))
+    response = loaded_entry.to_response()
+
+    assert tag_versions == {"appeals": 3}
+    assert loaded_entry == entry
+    assert response.body == body
+    assert response.media_type == "application/json"
+    assert json.loads(body)[0]["next_cursor"]
+
+
+@pytest.mark.parametrize("body_size, expected_codec", [(10, None), (100_000, "zlib")])
+def test_cache_entry_compression(monkeypatch, body_size, expected_codec):
+    monkeypatch.setattr(settings, "CACHE_COMPRESSION_THRESHOLD", 1024)
+    entry = CacheEntry(body=b"[" + b"1," * (body_size // 2) + b"1]", created_at=time.time(), compute_time=0.1)
+
+    cached_data = entry.dump({})
+    header = json.loads(cached_data.partition(b"\n")[0])
+
+    assert header["codec"] == expected_codec
+    assert CacheEntry.load(cached_data) == ({}, entry)
+    if expected_codec:
+        assert len(cached_data) < entry.size
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> FakeRedisClient:
+    redis = FakeRedisClient()
+    monkeypatch.setattr(settings, "IS_TESTING", False)
+    monkeypatch.setattr(settings, "LOCAL_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "CACHE_WARM_ENABLED", False)
+    monkeypatch.setattr(settings, "CACHE_LOCK_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr("utils.cache.redis_client", redis)
+    return redis
+
+
+async def test_cache_waits_for_lock_holder_entry(monkeypatch, fake_redis):
+    calls = 0
+
+    @cache(expire=60)
+    async def get_value(value_id: int) -> str:
+        nonlocal calls
+        calls += 1
+        return "computed"
+
+    async def store_holder_entry() -> None:
+        await asyncio.sleep(0.03)
+        entry = CacheEntry(body=b'"holder"', created_at=time.time(), compute_time=0.03)
+        await fake_redis.set(create_cache_key("get_value", {"value_id": 1}), entry.dump({}), 60)
+
+    monkeypatch.setattr(settings, "CACHE_LOCK_WAIT", 1)
+    monkeypatch.setattr(fake_redis, "acquire_lock", AsyncMock(return_value=None))
+    stats_before = cache_stats.copy()
+    holder = asyncio.create_task(store_holder_entry())
+
+    response = await get_value(value_id=1)
+    await holder
+
+    assert response.body == b'"holder"'
+    assert calls == 0
+    assert cache_stats["lock_wait_hits"] - stats_before["lock_wait_hits"] == 1
+
+
+async def test_cache_computes_after_lock_wait(monkeypatch, fake_redis):
+    calls = 0
+
+    @cache(expire=60)
+    async def get_value(value_id: int) -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "computed"
+
+    monkeypatch.setattr(settings, "CACHE_LOCK_WAIT", 0.05)
+    monkeypatch.setattr(fake_redis, "acquire_lock", AsyncMock(return_value=None))
+    stats_before = cache_stats.copy()
+
+    responses = await asyncio.gather(*(get_value(value_id=1) for _ in range(5)))
+
+    assert [response.body for response in responses] == [b'"computed"'] * 5
+    assert calls == 1
+    assert cache_stats["lock_waits"] - stats_before["lock_waits"] == 1
+    assert cache_stats["lock_wait_timeouts"] - stats_before["lock_wait_timeouts"] == 1
+    assert create_cache_key("get_value", {"value_id": 1}) in fake_redis.values
+
+
+@pytest.mark.parametrize("tag_version, expected_body", [(1, b'"stale"'), (2, b'"fresh"')])
+async def test_cache_serves_stale_entry(fake_redis, tag_version, expected_body):
+    calls = 0
+
+    @cache(expire=60, stale=30, tags=lambda value_id: [f"appeal:{value_id}"])
+    async def get_value(value_id: int) -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "fresh"
+
+    cache_key = create_cache_key("get_value", {"value_id": 1})
+    entry = CacheEntry(body=b'"stale"', created_at=time.time() - 70, compute_time=0.01)
+    await fake_redis.set(cache_key, entry.dump({"appeal:1": 1}), 90)
+    fake_redis.values["cache_tag:appeal:1"] = tag_version
+    stats_before = cache_stats.copy()
+
+    responses = [await get_value(value_id=1) for _ in range(3)]
+    await asyncio.gather(*background_tasks)
+
+    # An entry with a bumped tag is never served, it is recomputed by the request instead
+    assert [response.body for response in responses] == [expected_body] * 3
+    assert calls == 1
+    assert cache_stats["stale_hits"] - stats_before["stale_hits"] == (3 if tag_version == 1 else 0)
+    assert CacheEntry.load(fake_redis.values[cache_key])[1].body == b'"fresh"'
+
+
+async def test_cache_negative_entry(fake_redis):
+    appeals, calls = {}, 0
+
+    @cache(expire=60, tags=AppealService.get_appeal_cache_tags, negative_expire=30)
+    async def get_appeal(appeal_id: int) -> dict:
+        nonlocal calls
+        calls += 1
+        if appeal_id not in appeals:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appeal not found")
+        return appeals[appeal_id]
+
+    cache_key = create_cache_key("get_appeal", {"appeal_id": 1})
+    responses = [await get_appeal(appeal_id=1) for _ in range(2)]
+
+    assert [response.status_code for response in responses] == [status.HTTP_404_NOT_FOUND] * 2
+    assert json.loads(responses[1].body) == {"detail": "Appeal not found"}
+    assert calls == 1
+    assert fake_redis.expirations[cache_key] == 30
+
+    appeals[1] = {"id": 1}
+    appeal_row = SimpleNamespace(id=1, user_id=uuid4(), executor_id=None)
+    await invalidate_tags(*AppealService._get_write_cache_tags(appeal_row))
+    response = await get_appeal(appeal_id=1)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert json.loads(response.body) == {"id": 1}
+    assert calls == 2
+    assert fake_redis.expirations[cache_key] == 60
+
+
+@pytest.mark.parametrize("error", [RedisError("Connection refused"), CircuitOpenError("Circuit breaker redis is open")])
+async def test_cache_passes_through_on_redis_failure(monkeypatch, fake_redis, error):
+    @cache(expire=60, tags=lambda value_id: [f"appeal:{value_id}"])
+    async def get_value(value_id: int) -> dict:
+        return {"id": value_id}
+
+    for method in ("get", "get_many", "set", "acquire_lock", "release_lock"):
+        monkeypatch.setattr(fake_redis, method, AsyncMock(side_effect=error))
+    errors_before = cache_stats["redis_errors"]
+
+    response = await get_value(value_id=1)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert json.loads(response.body) == {"id": 1}
+    assert cache_stats["redis_errors"] > errors_before
+
+
+async def test_failed_invalidation_is_retried(monkeypatch, fake_redis):
+    calls = 0
+
+    @cache(expire=60, tags=lambda value_id: [f"appeal:{value_id}"])
+    async def get_value(value_id: int) -> int:
+        nonlocal calls
+        calls += 1
+        return calls
+
+    await get_value(value_id=1)
+    incr_many = fake_redis.incr_many
+    monkeypatch.setattr(fake_redis, "incr_many", AsyncMock(side_effect=RedisError("Connection refused")))
+    await invalidate_tags("appeal:1")
+
+    # The entry is not served by the worker that failed to bump its tag
+    assert json.loads((await get_value(value_id=1)).body) == 2
+    assert "appeal:1" in pending_invalidations
+
+    monkeypatch.setattr(fake_redis, "incr_many", incr_many)
+    monkeypatch.setattr(settings, "CACHE_INVALIDATION_RETRY_INTERVAL", 0.01)
+    retrier = asyncio.create_task(retry_invalidations())
+    await asyncio.sleep(0.05)
+    retrier.cancel()
+
+    assert not pending_invalidations
+    assert "cache_tag:appeal:1" in fake_redis.values
+    assert json.loads((await get_value(value_id=1)).body) == 3
+
+
+async def test_circuit_breaker(monkeypatch):
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=10, errors=(ConnectionError,))
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    async def call(error: Exception | None = None) -> None:
+        async with breaker.guard():
+            if error:
+                raise error
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await call(ConnectionError())
+    with pytest.raises(CircuitOpenError):
+        await call()
+    assert (breaker.state, breaker.trips, breaker.rejected) == (CircuitState.open, 1, 1)
+
+    now += 10
+    with pytest.raises(ConnectionError):
+        await call(ConnectionError())
+    assert (breaker.state, breaker.trips) == (CircuitState.open, 2)
+
+    now += 10
+    await call()
+    assert (breaker.state, breaker.failures) == (CircuitState.closed, 0)
+
+
+def test_cache_warmer_restores_endpoint_kwargs():
+    async def get_appeals_list(filters: AppealListFilters, user_data: JWTUserData) -> list:
+        return []
+
+    warmer = CacheWarmer()
+    warmer.register("get_appeals_list", get_appeals_list, get_appeals_list, tags=None)
+    kwargs = {
+        "filters": AppealListFilters(status=AppealStatus.done, created_date_from=datetime(2026, 1, 1), limit=10),
+        "user_data": JWTUserData(id=str(uuid4()), role=UserRole.executor),
+    }
+    cache_key = create_cache_key("get_appeals_list", AppealService.get_appeals_list_cache_key(**kwargs))
+
+    dumped_kwargs = json.loads(json.dumps(to_jsonable_python(kwargs)))
+    loaded_kwargs = CacheWarmer._load_kwargs(warmer._endpoints["get_appeals_list"], dumped_kwargs)
+
+    assert loaded_kwargs == kwargs
+    assert create_cache_key("get_appeals_list", AppealService.get_appeals_list_cache_key(**loaded_kwargs)) == cache_key
+
+
+async def test_cache_warmer_skips_stale_hot_keys(monkeypatch):
+    served = []
+
+    async def get_appeals_list(filters: AppealListFilters) -> list:
+        served.append(filters)
+        return []
+
+    valid_member = json.dumps({"endpoint": "get_appeals_list", "kwargs": {"filters": {"limit": 10}}}).encode()
+    renamed_member = json.dumps({"endpoint": "get_appeals_list", "kwargs": {"query": {"limit": 10}}}).encode()
+    invalid_member = json.dumps({"endpoint": "get_appeals_list", "kwargs": {"filters": {"limit": -1}}}).encode()
+    redis = SimpleNamespace(
+        get_top_members=AsyncMock(return_value=[renamed_member, b"not json", valid_member, invalid_member]),
+        remove_members=AsyncMock(),
+    )
+    monkeypatch.setattr(cache_warmer, "redis_client", redis)
+    warmer = CacheWarmer()
+    warmer.register("get_appeals_list", get_appeals_list, get_appeals_list, tags=None)
+
+    await warmer.warm()
+
+    assert served == [AppealListFilters(limit=10)]
+    assert (warmer.warmed, warmer.skipped) == (1, 3)
+    redis.remove_members.assert_awaited_once_with(
+        cache_warmer.HOT_KEYS_KEY, [renamed_member, b"not json", invalid_member]
+    )
+
@@ -0,0 +1,215 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi import status
+
+from clients.http.base import BaseAsyncClient, get_path_template
+from common.settings import settings
+from utils.enums import CircuitState
+from utils.histogram import Histogram
+from utils.retry_budget import RetryBudget
+
+
+@pytest.mark.parametrize(
+    "path, expected_template",
+    [
+        ("/api/v1/users/me", "/api/v1/users/me"),
+        ("api/v1/users/42", "/api/v1/users/{id}"),
+        ("/api/v1/users/0b0c1c8e-2f7a-4c4e-9d1a-1e2b3c4d5e6f/email", "/api/v1/users/{id}/email"),
+    ]
+)
+def test_path_template(path, expected_template):
+    assert get_path_template(path) == expected_template
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, max_tokens=2)
+
+    assert [budget.withdraw() for _ in range(3)] == [True, True, False]
+    budget.deposit()
+    assert budget.withdraw() is False
+    budget.deposit()
+    assert budget.withdraw() is True
+    assert budget.exhausted == 2
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 3):
+        histogram.observe(value)
+
+    assert histogram.get_stats() == {"count": 4, "sum": 4.25, "buckets": {"0.1": 1, "1": 3, "+Inf": 4}}
+    assert histogram.get_percentile(0.25) == 0.1
+    assert histogram.get_percentile(0.75) == 1
+    assert histogram.get_percentile(0.95) == 1
+
+
+@pytest.fixture
+async def make_client(monkeypatch):
+    """Start a server with the handler and return a client of it, with a breaker of its own."""
+    monkeypatch.setattr("clients.http.base.breakers", {})
+    servers, clients = [], []
+
+    async def make_client(handler: Callable[[web.Request], Awaitable[web.Response]], timeout: float = 1):
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", handler)
+        server = TestServer(app)
+        await server.start_server()
+        servers.append(server)
+        client = BaseAsyncClient(str(server.make_url("")), timeout)
+        clients.append(client)
+        return client
+
+    yield make_client
+
+    for client in clients:
+        await client.disconnect()
+    for server in servers:
+        await server.close()
+
+
+async def test_http_breaker_opens_on_timeouts(monkeypatch, make_client):
+    monkeypatch.setattr(settings, "HTTP_BREAKER_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "HTTP_BREAKER_RECOVERY_TIMEOUT", 0.2)
+    calls, delay = 0, 0.2
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(delay)
+        return web.json_response({})
+
+    client = await make_client(handler, timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(ConnectionError, match="after 0 retries"):
+            async with client._get("/api/v1/users/me", retry=0):
+                pass
+    with pytest.raises(ConnectionError, match="Circuit breaker"):
+        async with client._get("/api/v1/users/me", retry=0):
+            pass
+
+    assert calls == 2
+    assert client.breaker.state == CircuitState.open
+
+    # After the recovery timeout a probe is let through and its success closes the circuit
+    delay = 0
+    await asyncio.sleep(0.2)
+    async with client._get("/api/v1/users/me", retry=0) as response:
+        assert response.status == status.HTTP_200_OK
+
+    assert calls == 3
+    assert client.breaker.state == CircuitState.closed
+    assert client.outcomes["GET /api/v1/users/me"] == {"timeout": 2, "circuit_open": 1, "success": 1}
+
+
+async def test_http_retries_stop_on_empty_budget(make_client):
+    calls = 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return web.json_response({})
+
+    client = await make_client(handler, timeout=0.05)
+    client.retry_budget = RetryBudget(ratio=0, max_tokens=1)
+
+    with pytest.raises(ConnectionError, match="after 1 retries"):
+        async with client._get("/api/v1/users/me", retry=3, retry_delay=0):
+            pass
+
+    assert calls == 2
+    assert client.retry_budget.exhausted == 1
+
+
+async def test_http_outcomes_by_path_template(make_client):
+    async def handler(request: web.Request) -> web.Response:
+        if request.match_info["path"] == "api/v1/users/43/email":
+            return web.json_response({}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return web.json_response("user@example.com")
+
+    client = await make_client(handler)
+    for user_id in (42, 43):
+        async with client._get(f"/api/v1/users/{user_id}/email"):
+            pass
+
+    endpoint = "GET /api/v1/users/{id}/email"
+    assert client.outcomes == {endpoint: {"success": 1, "server_error": 1}}
+    assert client.latencies[endpoint].count == 2
+    assert list(client.get_stats()["endpoints"]) == [endpoint]
+
+
+async def test_hedged_request_wins(monkeypatch, make_client):
+    monkeypatch.setattr(settings, "HTTP_HEDGE_DEFAULT_DELAY", 0.05)
+    calls = 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal calls
+        calls += 1
+        call = calls
+        if call == 1:
+            await asyncio.sleep(0.5)
+        return web.json_response({"call": call})
+
+    client = await make_client(handler)
+    fetches = []
+    fetch = client._fetch
+
+    async def record_fetch(*args, **kwargs):
+        fetches.append(asyncio.current_task())
+        return await fetch(*args, **kwargs)
+
+    monkeypatch.setattr(client, "_fetch", record_fetch)
+
+    async with client._get("/api/v1/users/me", hedge=True) as response:
+        body = await response.json()
+
+    assert body == {"call": 2}
+    assert (client.stats["hedges"], client.stats["hedge_wins"]) == (1, 1)
+    assert len(fetches) == 2
+    await asyncio.wait([fetches[0]], timeout=1)
+    assert fetches[0].cancelled()
+
+
+async def test_hedging_stops_on_empty_budget(monkeypatch, make_client):
+    monkeypatch.setattr(settings, "HTTP_HEDGE_DEFAULT_DELAY", 0.02)
+    calls = 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return web.json_response({})
+
+    client = await make_client(handler)
+    client.hedge_budget = RetryBudget(ratio=0, max_tokens=0)
+
+    async with client._get("/api/v1/users/me", hedge=True) as response:
+        assert response.status == status.HTTP_200_OK
+
+    assert calls == 1
+    assert client.stats["hedges"] == 0
+    assert client.hedge_budget.exhausted == 1
+
+
+@pytest.mark.parametrize("method", ["POST", "PUT", "PATCH", "DELETE"])
+async def test_non_get_request_is_not_hedged(monkeypatch, make_client, method):
+    monkeypatch.setattr(settings, "HTTP_HEDGE_DEFAULT_DELAY", 0.02)
+    calls = 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return web.json_response({})
+
+    client = await make_client(handler)
+
+    async with client._request(method, "/api/v1/users/registration", hedge=True) as response:
+        assert response.status == status.HTTP_200_OK
+
+    assert calls == 1
+    assert client.stats["hedges"] == 0
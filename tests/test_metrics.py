@@ -0,0 +1,21 @@
+import pytest
+from fastapi import status
+
+from tests.utils.tokens import create_access_token
+from utils.enums import UserRole
+
+
+@pytest.mark.parametrize(
+    "role, expected_status",
+    [
+        (UserRole.user, status.HTTP_403_FORBIDDEN),
+        (UserRole.executor, status.HTTP_403_FORBIDDEN),
+        (UserRole.admin, status.HTTP_200_OK),
+    ]
+)
+def test_db_pool_metrics(client, role, expected_status):
+    access_token = create_access_token(role)["access_token"]
+
+    response = client.get("/metrics/db_pool", cookies={"access_token": access_token})
+
+    assert response.status_code == expected_status
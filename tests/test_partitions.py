@@ -0,0 +1,53 @@
+import asyncio
+from uuid import uuid4
+
+from sqlalchemy import delete, insert, select, text
+
+from common.settings import settings
+from db.connector import AsyncSession
+from db.partitions import (
+    add_months,
+    get_current_month_start,
+    get_partition_name,
+    get_partition_names,
+    maintain_partitions,
+)
+from db.tables.appeals import Appeal
+from utils.enums import AppealResponsibilityArea, AppealStatus
+
+MONTHS_AHEAD = 12
+
+
+async def test_maintain_partitions_moves_rows_from_default_partition():
+    async with AsyncSession() as session:
+        partition_names = set(await get_partition_names(session))
+        month_start = add_months(await get_current_month_start(session), MONTHS_AHEAD)
+        result = await session.execute(
+            insert(Appeal).values(
+                user_id=str(uuid4()),
+                message="test_maintain_partitions_message",
+                responsibility_area=AppealResponsibilityArea.road,
+                status=AppealStatus.accepted,
+                created_at=month_start.replace(day=15),
+            ).returning(Appeal.id)
+        )
+        appeal_id = result.scalar()
+        await session.commit()
+
+    # The concurrent runs must not race for the same partitions
+    await asyncio.gather(*(maintain_partitions(months_ahead=MONTHS_AHEAD, retention_months=0) for _ in range(2)))
+
+    async with AsyncSession() as session:
+        result = await session.execute(
+            select(text("tableoid::regclass::text")).select_from(Appeal).where(Appeal.id == appeal_id)
+        )
+        table_name = result.scalar()
+        created_partitions = set(await get_partition_names(session)) - partition_names
+
+        await session.execute(delete(Appeal).where(Appeal.id == appeal_id))
+        for partition_name in created_partitions:
+            await session.execute(text(f"DROP TABLE {settings.DB_SCHEMA}.{partition_name}"))
+        await session.commit()
+
+    assert table_name == f"{settings.DB_SCHEMA}.{get_partition_name(month_start)}"
+    assert get_partition_name(month_start) in created_partitions
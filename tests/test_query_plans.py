@@ -0,0 +1,156 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, text
+
+from common.settings import settings
+from db.connector import AsyncSession
+from db.tables.appeals import Appeal
+from repositories.appeal import AppealRepository
+from utils.enums import AppealResponsibilityArea, AppealSortField, AppealStatus
+from utils.pagination import encode_cursor
+
+SEED_ROWS_COUNT = 100_000
+SEED_MESSAGE = "test_query_plans_message"
+SEED_USER_ID = "00000000-0000-0000-0000-000000000001"
+SEED_EXECUTOR_ID = "00000000-0000-0000-0000-000000000002"
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def seed_appeals():
+    statuses = ", ".join(f"'{value}'" for value in AppealStatus)
+    areas = ", ".join(f"'{value}'" for value in AppealResponsibilityArea)
+    async with AsyncSession() as session:
+        await session.execute(text(f"""
+            INSERT INTO {settings.DB_SCHEMA}.appeals
+                (user_id, message, responsibility_area, executor_id, status, created_at, updated_at)
+            SELECT
+                CASE WHEN i % 5000 = 0 THEN '{SEED_USER_ID}'::uuid ELSE md5('user' || i % 5000)::uuid END,
+                '{SEED_MESSAGE}',
+                (ARRAY[{areas}])[1 + (i / 7) % 5]::{settings.DB_SCHEMA}.appealresponsibilityarea,
+                CASE
+                    WHEN i % 5 = 0 THEN NULL
+                    WHEN i % 200 = 1 THEN '{SEED_EXECUTOR_ID}'::uuid
+                    ELSE md5('executor' || i % 200)::uuid
+                END,
+                (ARRAY[{statuses}])[1 + i % 5]::{settings.DB_SCHEMA}.appealstatus,
+                now() - make_interval(mins => i),
+                now() - make_interval(mins => i)
+            FROM generate_series(1, {SEED_ROWS_COUNT}) AS i
+        """))
+        await session.commit()
+        await session.execute(text(f"ANALYZE {settings.DB_SCHEMA}.appeals"))
+        await session.commit()
+        populated_partitions = await session.execute(text(
+            f"SELECT DISTINCT pg_class.relname FROM {settings.DB_SCHEMA}.appeals "
+            f"JOIN pg_class ON pg_class.oid = appeals.tableoid"
+        ))
+        populated_partitions = set(populated_partitions.scalars().all())
+
+    yield populated_partitions
+
+    async with AsyncSession() as session:
+        await session.execute(delete(Appeal).where(Appeal.message == SEED_MESSAGE))
+        await session.commit()
+
+
+@pytest.fixture(scope="module")
+async def parent_index_names() -> dict[str, tuple[str, str]]:
+    """The table and the partitioned index name by the index name, the plans show the indexes of the partitions."""
+    async with AsyncSession() as session:
+        result = await session.execute(
+            text(
+                "SELECT idx.relname, tbl.relname, COALESCE(parent.relname, idx.relname) FROM pg_index "
+                "JOIN pg_class idx ON idx.oid = pg_index.indexrelid "
+                "JOIN pg_class tbl ON tbl.oid = pg_index.indrelid "
+                "JOIN pg_namespace ON pg_namespace.oid = idx.relnamespace "
+                "LEFT JOIN pg_inherits ON pg_inherits.inhrelid = idx.oid "
+                "LEFT JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "WHERE pg_namespace.nspname = :schema"
+            ),
+            {"schema": settings.DB_SCHEMA},
+        )
+        return {name: (table_name, parent_name) for name, table_name, parent_name in result.all()}
+
+
+@pytest.mark.parametrize(
+    "filters, expected_indexes",
+    [
+        # The rows matching an unselective filter are spread over the id order,
+        # so the page is found by reading the primary key until it is full
+        ({}, {"PK_appeals"}),
+        ({"user_id": SEED_USER_ID}, {"IX_appeals_user_id_id"}),
+        ({"user_id": SEED_USER_ID, "status": AppealStatus.accepted}, {"IX_appeals_user_id_id"}),
+        ({"executor_id": SEED_EXECUTOR_ID}, {"IX_appeals_executor_id_status_id"}),
+        (
+            {"executor_id": SEED_EXECUTOR_ID, "status": AppealStatus.in_progress},
+            {"IX_appeals_executor_id_status_id"},
+        ),
+        ({"status": AppealStatus.accepted}, {"IX_appeals_accepted_id"}),
+        (
+            {"status": AppealStatus.done, "responsibility_area": AppealResponsibilityArea.road},
+            {"IX_appeals_status_responsibility_area_id"},
+        ),
+        (
+            {
+                "status": AppealStatus.in_progress,
+                "responsibility_area": AppealResponsibilityArea.housing,
+                "created_date_from": datetime.now() - timedelta(days=3),
+                "created_date_to": datetime.now() - timedelta(days=2),
+            },
+            {"IX_appeals_status_responsibility_area_id", "IX_appeals_created_at_id"},
+        ),
+        ({"responsibility_area": AppealResponsibilityArea.other}, {"PK_appeals"}),
+        (
+            {
+                "created_date_from": datetime.now() - timedelta(days=3),
+                "created_date_to": datetime.now() - timedelta(days=2),
+            },
+            {"PK_appeals"},
+        ),
+        ({"sort_by": AppealSortField.created_at}, {"IX_appeals_created_at_id"}),
+        ({"cursor": encode_cursor(SEED_ROWS_COUNT // 2, datetime.now() - timedelta(days=30))}, {"PK_appeals"}),
+        (
+            {
+                "sort_by": AppealSortField.created_at,
+                "cursor": encode_cursor(SEED_ROWS_COUNT // 2, datetime.now() - timedelta(days=30)),
+            },
+            {"IX_appeals_created_at_id"},
+        ),
+        ({"q": "pothole"}, {"IX_appeals_message_tsv", "IX_appeals_message_trgm"}),
+        (
+            {"q": "pothole", "status": AppealStatus.accepted},
+            {"IX_appeals_message_tsv", "IX_appeals_message_trgm", "IX_appeals_accepted_id"},
+        ),
+    ]
+)
+async def test_appeals_list_query_uses_index(seed_appeals, parent_index_names, filters, expected_indexes):
+    query = AppealRepository.get_appeals_list_query({"limit": 100, **filters})
+
+    async with AsyncSession() as session:
+        # The dialect of the connection renders the literals the way the server parses them
+        connection = await session.connection()
+        compiled_query = query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+        result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled_query}"))
+        plan = result.scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    nodes = get_plan_nodes(plan[0]["Plan"])
+    # Empty partitions may be scanned sequentially or by any index, it costs nothing
+    seq_scanned_relations = {node.get("Relation Name") for node in nodes if node["Node Type"] == "Seq Scan"}
+    used_indexes = set()
+    for node in nodes:
+        if index_name := node.get("Index Name"):
+            table_name, parent_index_name = parent_index_names[index_name]
+            if table_name in seed_appeals:
+                used_indexes.add(parent_index_name)
+
+    assert used_indexes and used_indexes <= expected_indexes, plan
+    assert not seq_scanned_relations & seed_appeals, plan
+
+
+def get_plan_nodes(plan: dict) -> list[dict]:
+    nodes = [plan]
+    for subplan in plan.get("Plans", []):
+        nodes.extend(get_plan_nodes(subplan))
+    return nodes
@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy import delete, insert
+
+from db.connector import AsyncSession
+from db.tables import Appeal
+from repositories.statistics import StatisticsRepository
+from services.statistics import StatisticsService
+from utils.enums import AppealResponsibilityArea, AppealStatus
+
+
+def get_statistics(client, admin_data) -> dict:
+    response = client.get(
+        "/api/v1/statistics/appeals", cookies={"access_token": admin_data.get("access_token")}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def get_executor_backlog(statistics: dict, executor_id: str) -> int:
+    return sum(item["count"] for item in statistics["executors_backlog"] if item["executor_id"] == executor_id)
+
+
+@pytest.mark.parametrize(
+    "message, responsibility_area",
+    [
+        ("test_statistics_message_1", AppealResponsibilityArea.housing),
+        ("test_statistics_message_2", AppealResponsibilityArea.road),
+    ]
+)
+async def test_appeals_statistics(client, admin_data, user_data, executor_data, message, responsibility_area):
+    await StatisticsService.rebuild()
+    initial_statistics = get_statistics(client, admin_data)
+
+    client.post(
+        "/api/v1/appeals/",
+        params={"message": message, "responsibility_area": responsibility_area},
+        cookies={"access_token": user_data.get("access_token")},
+    )
+    created_statistics = get_statistics(client, admin_data)
+
+    appeal_id = client.get(
+        "/api/v1/appeals/", params={"self": True}, cookies={"access_token": user_data.get("access_token")}
+    ).json()[0]["id"]
+    client.patch(f"/api/v1/appeals/{appeal_id}/assign", cookies={"access_token": executor_data.get("access_token")})
+    assigned_statistics = get_statistics(client, admin_data)
+
+    client.patch(
+        f"/api/v1/appeals/{appeal_id}/executor",
+        params={"status": AppealStatus.done},
+        cookies={"access_token": executor_data.get("access_token")},
+    )
+    done_statistics = get_statistics(client, admin_data)
+
+    await StatisticsService.rebuild()
+    rebuilt_statistics = get_statistics(client, admin_data)
+
+    today = [item for item in created_statistics["by_day"] if item["day"] == date.today().isoformat()]
+    assert created_statistics["by_status"][AppealStatus.accepted] == (
+        initial_statistics["by_status"].get(AppealStatus.accepted, 0) + 1
+    )
+    assert created_statistics["by_responsibility_area"][responsibility_area] == (
+        initial_statistics["by_responsibility_area"].get(responsibility_area, 0) + 1
+    )
+    assert any(item["responsibility_area"] == responsibility_area for item in today)
+    assert assigned_statistics["by_status"][AppealStatus.in_progress] == (
+        created_statistics["by_status"].get(AppealStatus.in_progress, 0) + 1
+    )
+    assert get_executor_backlog(assigned_statistics, executor_data.get("id")) == 1
+    assert get_executor_backlog(done_statistics, executor_data.get("id")) == 0
+    assert done_statistics["median_resolution_hours"] is not None
+    assert done_statistics == rebuilt_statistics
+
+
+async def test_resolution_time_survives_done_appeal_edit(client, admin_data, user_data):
+    now = datetime.now()
+    async with AsyncSession() as session:
+        result = await session.execute(insert(Appeal).values(
+            user_id=user_data.get("id"),
+            message="test_resolution_time_message",
+            responsibility_area=AppealResponsibilityArea.road,
+            status=AppealStatus.done,
+            created_at=now - timedelta(hours=10),
+            updated_at=now - timedelta(hours=5),
+            resolved_at=now - timedelta(hours=5),
+        ).returning(Appeal.id))
+        appeal_id = result.scalar()
+        await session.commit()
+    await StatisticsService.rebuild()
+
+    async with AsyncSession() as session:
+        initial_resolution_time = await StatisticsRepository.select_resolution_time(session)
+
+    client.patch(
+        f"/api/v1/appeals/{appeal_id}/user",
+        params={"message": "test_resolution_time_message_edited"},
+        cookies={"access_token": admin_data.get("access_token")},
+    )
+    client.patch(
+        f"/api/v1/appeals/{appeal_id}/executor",
+        params={"status": AppealStatus.done, "comment": "test_resolution_time_comment"},
+        cookies={"access_token": admin_data.get("access_token")},
+    )
+
+    async with AsyncSession() as session:
+        edited_resolution_time = await StatisticsRepository.select_resolution_time(session)
+        await session.execute(delete(Appeal).where(Appeal.id == appeal_id))
+        await session.commit()
+    await StatisticsService.rebuild()
+
+    assert (5, 1) in {(row.hours, row.count) for row in initial_resolution_time}
+    assert edited_resolution_time == initial_resolution_time
+
+
+async def test_appeals_statistics_forbidden(client, user_data):
+    response = client.get("/api/v1/statistics/appeals", cookies={"access_token": user_data.get("access_token")})
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
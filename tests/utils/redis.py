@@ -0,0 +1,39 @@
+import time
+from uuid import uuid4
+
+
+class FakeRedisClient:
+    """In-memory stand-in for the RedisClient methods used by the cache, the expirations are recorded only."""
+
+    def __init__(self):
+        self.values = {}
+        self.expirations = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.values.get(key)
+
+    async def get_many(self, keys: list[str]) -> list:
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes | str, expire: int) -> None:
+        self.values[key] = value
+        self.expirations[key] = expire
+
+    async def acquire_lock(self, key: str, expire: float) -> str | None:
+        if key in self.values:
+            return None
+        token = uuid4().hex
+        await self.set(key, token, expire)
+        return token
+
+    async def release_lock(self, key: str, token: str) -> None:
+        if self.values.get(key) == token:
+            del self.values[key]
+
+    async def publish(self, channel: str, message: str) -> None:
+        pass
+
+    async def incr_many(self, keys: list[str], expire: int) -> None:
+        for key in keys:
+            self.values[key] = int(self.values.get(key) or time.time_ns()) + 1
+            self.expirations[key] = expire